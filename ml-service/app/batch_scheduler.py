@@ -0,0 +1,154 @@
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+# Cross-request micro-batching for the model calls.
+#
+# Callers hand their items to dispatch(name, items, fallback). When a
+# MicroBatcher is registered under `name` (the server registers one per
+# model at startup) the items are queued, coalesced with items from other
+# threads until max_batch items are waiting or the oldest has waited
+# max_wait seconds, and run through the batcher's function in one call.
+# Without a batcher (CLI, tests, benchmarks) fallback(items) runs inline.
+#
+# The queues are bounded: once max_queue items are waiting, dispatch raises
+# Overloaded instead of queueing more work.
+
+
+class Overloaded(Exception):
+    pass
+
+
+class MicroBatcher:
+    def __init__(self, name, fn, max_batch=64, max_wait=0.005, max_queue=2048):
+        self.name = name
+        self.fn = fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.max_queue = max_queue
+
+        self.batches = 0
+        self.items = 0
+        self.rejected = 0
+
+        self._queue = deque()
+        self._queued_items = 0
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread = threading.Thread(
+            target=self._run, name=f"batcher-{name}", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, items):
+        future = Future()
+        if not items:
+            future.set_result([])
+            return future
+
+        with self._cond:
+            if self._stopped:
+                raise RuntimeError(f"Batcher {self.name} is stopped")
+            if self._queued_items + len(items) > self.max_queue:
+                self.rejected += 1
+                raise Overloaded(f"{self.name} queue is full")
+            self._queue.append((list(items), future, time.monotonic()))
+            self._queued_items += len(items)
+            self._cond.notify()
+        return future
+
+    def _take_batch(self):
+        # wait for work, then for more work until the batch is full or the
+        # oldest request's deadline passes
+        with self._cond:
+            while not self._queue and not self._stopped:
+                self._cond.wait()
+            if self._stopped and not self._queue:
+                return None
+
+            deadline = self._queue[0][2] + self.max_wait
+            while self._queued_items < self.max_batch and not self._stopped:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            batch = []
+            size = 0
+            # whole requests only; one larger than max_batch goes alone
+            while self._queue and (not batch or size + len(self._queue[0][0]) <= self.max_batch):
+                items, future, _ = self._queue.popleft()
+                batch.append((items, future))
+                size += len(items)
+            self._queued_items -= size
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            if batch is None:
+                return
+
+            items = [item for request, _ in batch for item in request]
+            try:
+                results = self.fn(items)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.items += len(items)
+            start = 0
+            for request, future in batch:
+                future.set_result(list(results[start:start + len(request)]))
+                start += len(request)
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        self._thread.join()
+
+    def stats(self):
+        return {
+            "queued_items": self._queued_items,
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch": self.items / self.batches if self.batches else 0.0,
+            "rejected": self.rejected
+        }
+
+
+_batchers = {}
+_lock = threading.Lock()
+
+
+def register_batcher(name, fn, **kwargs):
+    with _lock:
+        if name in _batchers:
+            _batchers[name].stop()
+        _batchers[name] = MicroBatcher(name, fn, **kwargs)
+        return _batchers[name]
+
+
+def dispatch(name, items, fallback):
+    batcher = _batchers.get(name)
+    if batcher is None:
+        return fallback(items)
+    return batcher.submit(items).result()
+
+
+def stop_all():
+    with _lock:
+        for batcher in _batchers.values():
+            batcher.stop()
+        _batchers.clear()
+
+
+def scheduler_stats():
+    return {name: b.stats() for name, b in _batchers.items()}
@@ -0,0 +1,60 @@
+import json
+import random
+import re
+
+from app import lexical_index
+from app.config import metas_file
+from app.search import search_many
+
+NUM_QUERIES = 500
+KS = [5, 10, 20]
+DROP_FRACTION = 0.4
+BATCH = 32
+
+NUMERIC = re.compile(r"\d")
+
+def sample_rows(n, rng):
+    # reservoir sample so the corpus never has to fit in memory
+    sample = []
+    with open(metas_file, "r", encoding="utf-8") as f:
+        for i, line in enumerate(f):
+            if len(sample) < n:
+                sample.append(json.loads(line))
+            else:
+                j = rng.randint(0, i)
+                if j < n:
+                    sample[j] = json.loads(line)
+    return sample
+
+def make_query(sentence, rng):
+    # known-item query: the sentence with words dropped, keeping the
+    # numbers and capitalised tokens that dense embeddings tend to blur
+    words = sentence.split()
+    kept = [
+        w for w in words
+        if NUMERIC.search(w) or w[:1].isupper() or rng.random() > DROP_FRACTION
+    ]
+    return " ".join(kept or words)
+
+def recall(queries, targets, k, hybrid):
+    hits = 0
+    for start in range(0, len(queries), BATCH):
+        results = search_many(queries[start:start + BATCH], top_k=k, hybrid=hybrid)
+        for target, res in zip(targets[start:start + BATCH], results):
+            hits += any(r["id"] == target for r in res)
+    return hits / len(queries)
+
+if __name__ == "__main__":
+    if not lexical_index.available():
+        raise SystemExit("Build the lexical index first: python -m app.lexical_index")
+
+    rng = random.Random(0)
+    rows = sample_rows(NUM_QUERIES, rng)
+    queries = [make_query(r["sentence"], rng) for r in rows]
+    targets = [int(r["id"]) for r in rows]
+
+    print(f"{len(queries)} known-item queries, candidate budget = k")
+    for k in KS:
+        dense = recall(queries, targets, k, hybrid=False)
+        hybrid = recall(queries, targets, k, hybrid=True)
+        print(f"recall@{k:<3d} dense={dense:.4f} hybrid={hybrid:.4f} delta={hybrid - dense:+.4f}")
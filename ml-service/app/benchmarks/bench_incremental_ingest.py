@@ -0,0 +1,92 @@
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import app.search as search
+
+CORPUS_ROWS = 200_000
+NUM_DOCS = 300
+# the full-reload baseline is O(corpus) per document, so it gets fewer docs
+FULL_RELOAD_DOCS = 50
+ROWS_PER_DOC = 40
+REPORT_EVERY = 50
+
+WORDS = (
+    "attention transformer scaling model data energy cost training inference "
+    "retrieval evidence claim protein vaccine climate market policy theorem"
+).split()
+
+def synthetic_row(idx, doc_id, position):
+    return {
+        "id": idx,
+        "doc_id": doc_id,
+        "file_type": "txt",
+        "position": position,
+        "sentence": " ".join(random.choices(WORDS, k=random.randint(5, 40))),
+        "source_type": "local",
+        "credibility": 0.8,
+        "source_url": None,
+        "primary_category": None
+    }
+
+def write_corpus(path):
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(CORPUS_ROWS):
+            f.write(json.dumps(synthetic_row(i, f"doc_{i // 100}", i % 100)) + "\n")
+
+def ingest(path, next_id, doc_no, incremental):
+    rows = [
+        synthetic_row(next_id + pos, f"bench_{doc_no}", pos)
+        for pos in range(ROWS_PER_DOC)
+    ]
+
+    start_t = time.perf_counter()
+    with open(path, "ab") as f:
+        start = f.tell()
+        for row in rows:
+            f.write((json.dumps(row) + "\n").encode("utf-8"))
+        end = f.tell()
+
+    if incremental:
+        search.append_id_to_meta(rows, start, end)
+    else:
+        search.load_id_to_meta(force_reload=True)
+
+    return time.perf_counter() - start_t
+
+def run(incremental, num_docs):
+    tmp = Path(tempfile.mkdtemp())
+    path = tmp / "metas.jsonl"
+    write_corpus(path)
+
+    search.metas_file = path
+    search.id_to_meta = {}
+    search.load_id_to_meta()
+
+    label = "incremental" if incremental else "full reload"
+    timings = []
+    next_id = CORPUS_ROWS
+    for doc_no in range(num_docs):
+        timings.append(ingest(path, next_id, doc_no, incremental))
+        next_id += ROWS_PER_DOC
+
+        if (doc_no + 1) % REPORT_EVERY == 0:
+            window = timings[-REPORT_EVERY:]
+            print(
+                f"[{label}] docs {doc_no + 2 - REPORT_EVERY}-{doc_no + 1}: "
+                f"{1000 * sum(window) / len(window):.2f} ms/doc"
+            )
+
+    assert search.check_id_to_meta() == 0
+    assert len(search.id_to_meta) == CORPUS_ROWS + num_docs * ROWS_PER_DOC
+    return timings
+
+if __name__ == "__main__":
+    random.seed(0)
+    incremental = run(incremental=True, num_docs=NUM_DOCS)
+    full = run(incremental=False, num_docs=FULL_RELOAD_DOCS)
+
+    print("\nMEAN PER DOCUMENT (incremental):", round(1000 * sum(incremental) / len(incremental), 3), "ms")
+    print("MEAN PER DOCUMENT (full reload):", round(1000 * sum(full) / len(full), 3), "ms")
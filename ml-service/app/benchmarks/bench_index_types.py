@@ -0,0 +1,111 @@
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+import faiss
+
+from app import build_index
+from app.build_index import INDEX_FACTORY, _encode, _fit_index
+from app.config import metas_file, BASE_DIR, index_train_size
+
+EVAL_FILE = Path(__file__).resolve().parent.parent / "claim_pipeline_eval" / "claims_eval.json"
+OUT_FILE = BASE_DIR / "data" / "evaluations" / "index_types" / "results.json"
+
+K = 10
+# extra queries sampled from the corpus on top of the eval claims
+CORPUS_QUERIES = 500
+MAX_CORPUS = None
+
+def load_corpus(limit=MAX_CORPUS):
+    texts, ids = [], []
+    with open(metas_file, "r", encoding="utf-8") as f:
+        for line in f:
+            data = json.loads(line)
+            texts.append(data["sentence"])
+            ids.append(int(data["id"]))
+            if limit and len(texts) >= limit:
+                break
+    return texts, np.array(ids, dtype=np.int64)
+
+def load_queries(corpus_texts, rng):
+    with open(EVAL_FILE, "r", encoding="utf-8") as f:
+        claims = json.load(f)
+
+    queries = []
+    for item in claims:
+        queries.append(item["claim"])
+        queries.extend(sc["text"] for sc in item.get("expected_subclaims", []))
+
+    sample = rng.choice(len(corpus_texts), min(CORPUS_QUERIES, len(corpus_texts)), replace=False)
+    queries.extend(corpus_texts[i] for i in sample)
+    return queries
+
+def recall_at_k(found, truth):
+    hits = 0
+    for f, t in zip(found, truth):
+        hits += len(set(f[f != -1]) & set(t))
+    return hits / truth.size
+
+def latencies(index, queries):
+    out = []
+    for q in queries:
+        start = time.perf_counter()
+        index.search(q[None, :], K)
+        out.append(time.perf_counter() - start)
+    return np.array(out) * 1000
+
+def run(xb, ids, xq):
+    exact = faiss.IndexIDMap(faiss.IndexFlatIP(xb.shape[1]))
+    exact.add_with_ids(xb, ids)
+    _, truth = exact.search(xq, K)
+
+    rows = []
+    for kind in ["exact"] + list(INDEX_FACTORY):
+        if kind == "exact":
+            index = exact
+            build_s = 0.0
+        else:
+            start = time.perf_counter()
+            # same create-and-train path as the index build
+            index = _fit_index(xb.shape[1], kind, xb[:index_train_size])
+            index.add_with_ids(xb, ids)
+            build_s = time.perf_counter() - start
+
+        _, found = index.search(xq, K)
+        lat = latencies(index, xq)
+
+        rows.append({
+            "index_type": kind,
+            f"recall@{K}": recall_at_k(found, truth),
+            "p50_ms": float(np.percentile(lat, 50)),
+            "p99_ms": float(np.percentile(lat, 99)),
+            "index_bytes": int(faiss.serialize_index(index).size),
+            "bytes_per_vector": faiss.serialize_index(index).size / len(ids),
+            "build_s": build_s
+        })
+        r = rows[-1]
+        print(
+            f"{kind:10s} recall@{K}={r[f'recall@{K}']:.4f} p50={r['p50_ms']:.3f}ms "
+            f"p99={r['p99_ms']:.3f}ms size={r['index_bytes'] / 2**20:.1f}MB "
+            f"({r['bytes_per_vector']:.0f} B/vec) build={build_s:.1f}s"
+        )
+
+    return rows
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    faiss.omp_set_num_threads(1)
+
+    texts, ids = load_corpus()
+    # corpus vectors come from the embedding cache, so repeat runs are cheap
+    xb = _encode(texts, show_progress_bar=True)
+    xq = _encode(load_queries(texts, rng))
+
+    print(f"Corpus: {len(ids)} vectors, {len(xq)} queries, d={xb.shape[1]}")
+    rows = run(xb, ids, xq)
+    print(f"Embedding cache: {build_index.embedding_cache.stats()}")
+
+    OUT_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(OUT_FILE, "w", encoding="utf-8") as f:
+        json.dump({"k": K, "num_vectors": len(ids), "num_queries": len(xq), "results": rows}, f, indent=2)
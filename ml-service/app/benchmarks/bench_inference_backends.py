@@ -0,0 +1,108 @@
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.config import ms_marco_6, roberta_large, nli_batch_size
+from app.inference_backends import OnnxCrossEncoder, OnnxSequenceClassifier
+
+EVAL_FILE = Path(__file__).resolve().parent.parent / "claim_pipeline_eval" / "claims_eval.json"
+BACKENDS = ["torch", "onnx", "onnx-int8"]
+BATCH_SIZE = nli_batch_size
+REPEATS = 3
+
+def load_pairs(path):
+    # every expected subclaim against every claim gives related and
+    # unrelated pairs of realistic length
+    with open(path, "r", encoding="utf-8") as f:
+        items = json.load(f)
+    claims = [item["claim"] for item in items]
+    subclaims = [s["text"] for item in items for s in item.get("expected_subclaims", [])]
+    return [(s, c) for s in subclaims[:40] for c in claims[:10]]
+
+def softmax(x):
+    e = np.exp(x - x.max(axis=-1, keepdims=True))
+    return e / e.sum(axis=-1, keepdims=True)
+
+def sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+class TorchClassifier:
+    def __init__(self, name):
+        import torch
+        from transformers import AutoTokenizer, AutoModelForSequenceClassification
+        self.torch = torch
+        self.tokenizer = AutoTokenizer.from_pretrained(name)
+        self.model = AutoModelForSequenceClassification.from_pretrained(name).eval()
+
+    def logits(self, inputs):
+        with self.torch.no_grad():
+            return self.model(**inputs).logits.numpy()
+
+def load(name, backend):
+    if backend == "torch":
+        return TorchClassifier(name)
+    if name == ms_marco_6:
+        return OnnxCrossEncoder(name, backend)
+    return OnnxSequenceClassifier(name, backend)
+
+def run(model, first, second):
+    tensors = "pt" if isinstance(model, TorchClassifier) else "np"
+    out = []
+    for start in range(0, len(first), BATCH_SIZE):
+        inputs = model.tokenizer(
+            first[start:start + BATCH_SIZE],
+            second[start:start + BATCH_SIZE],
+            truncation=True,
+            padding=True,
+            return_tensors=tensors
+        )
+        out.append(model.logits(inputs))
+    return np.concatenate(out)
+
+def best_of(fn):
+    best = None
+    out = None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        out = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, out
+
+def bench_model(name, pairs):
+    if name == roberta_large:
+        # NLI takes the evidence as premise and the subclaim as hypothesis
+        first, second = [p[1] for p in pairs], [p[0] for p in pairs]
+        to_probs = softmax
+    else:
+        first, second = [p[0] for p in pairs], [p[1] for p in pairs]
+        to_probs = lambda logits: sigmoid(logits.reshape(-1))
+
+    reference = None
+    torch_s = None
+    print(f"\n{name} ({len(pairs)} pairs, batch {BATCH_SIZE}, CPU)")
+    for backend in BACKENDS:
+        model = load(name, backend)
+        run(model, first[:BATCH_SIZE], second[:BATCH_SIZE])  # warm up
+        seconds, logits = best_of(lambda: run(model, first, second))
+        probs = to_probs(logits)
+
+        if reference is None:
+            reference, torch_s = probs, seconds
+        delta = np.abs(probs - reference)
+        if probs.ndim == 2:
+            agree = (probs.argmax(axis=1) == reference.argmax(axis=1)).mean()
+        else:
+            agree = ((probs > 0.5) == (reference > 0.5)).mean()
+
+        print(
+            f"{backend:10s} {1000 * seconds / len(pairs):7.2f} ms/pair  x{torch_s / seconds:5.2f} | "
+            f"mean |dp| {delta.mean():.2e}  max |dp| {delta.max():.2e} | agreement {agree:.3f}"
+        )
+
+if __name__ == "__main__":
+    pairs = load_pairs(EVAL_FILE)
+    for name in [ms_marco_6, roberta_large]:
+        bench_model(name, pairs)
@@ -0,0 +1,99 @@
+import json
+import time
+from pathlib import Path
+
+from app import claim_pipeline, stance_classifier
+from app.claim_pipeline import claim_wrapper, decompose_claim
+from app.config import stance_eval_dir, nli_escalation_band
+from app.stance_classifier import stance_score_batch, cascade_stats
+from app.stance_eval_examples import curated_examples
+
+EVAL_FILE = Path(__file__).resolve().parent.parent / "claim_pipeline_eval" / "claims_eval.json"
+REPORT_FILE = stance_eval_dir / "nli_cascade_report.json"
+MODES = ["single", "cascade"]
+
+def label(probs):
+    return max(probs, key=probs.get)
+
+def reset_stats():
+    cascade_stats["pairs"] = 0
+    cascade_stats["escalated"] = 0
+
+def escalation_rate():
+    return cascade_stats["escalated"] / max(1, cascade_stats["pairs"])
+
+def curated_report():
+    pairs = [(e["claim"], e["evidence"]) for e in curated_examples]
+    gold = [e["gold"] for e in curated_examples]
+
+    out = {}
+    for mode in MODES:
+        reset_stats()
+        stance_score_batch(pairs[:4], mode=mode)  # warm up
+        reset_stats()
+        start = time.perf_counter()
+        labels = [label(p) for p in stance_score_batch(pairs, mode=mode)]
+        out[mode] = {
+            "seconds": time.perf_counter() - start,
+            "accuracy": sum(a == b for a, b in zip(labels, gold)) / len(gold),
+            "labels": labels
+        }
+    out["cascade"]["escalation_rate"] = escalation_rate()
+    out["agreement"] = sum(
+        a == b for a, b in zip(out["single"]["labels"], out["cascade"]["labels"])
+    ) / len(pairs)
+    return out
+
+def claims_report(items):
+    decompositions = {item["claim"]: decompose_claim(item["claim"]) for item in items}
+    claim_pipeline.decompose_claim = lambda claim: decompositions[claim]
+    expected = [item["expected_final_verdict"] for item in items]
+
+    out = {}
+    for mode in MODES:
+        stance_classifier.stance_mode = mode
+        claim_wrapper(items[0]["claim"])  # warm up
+        reset_stats()
+        start = time.perf_counter()
+        verdicts = [claim_wrapper(item["claim"])["verdict"] for item in items]
+        out[mode] = {
+            "seconds": time.perf_counter() - start,
+            "accuracy": sum(a == b for a, b in zip(verdicts, expected)) / len(items),
+            "verdicts": verdicts
+        }
+    out["cascade"]["escalation_rate"] = escalation_rate()
+    out["agreement"] = sum(
+        a == b for a, b in zip(out["single"]["verdicts"], out["cascade"]["verdicts"])
+    ) / len(items)
+    return out
+
+def summary(name, report):
+    single, cascade = report["single"], report["cascade"]
+    saved = 1 - cascade["seconds"] / single["seconds"]
+    print(
+        f"{name:10s} escalated {cascade['escalation_rate']:.1%} | "
+        f"{single['seconds']:.2f}s -> {cascade['seconds']:.2f}s ({saved:.1%} saved) | "
+        f"accuracy {single['accuracy']:.3f} -> {cascade['accuracy']:.3f} | "
+        f"agreement {report['agreement']:.3f}"
+    )
+
+if __name__ == "__main__":
+    # every pair has to reach a model for the timings to mean anything
+    stance_classifier.nli_cache = False
+
+    with open(EVAL_FILE, "r", encoding="utf-8") as f:
+        items = json.load(f)
+
+    report = {
+        "band": list(nli_escalation_band),
+        "curated": curated_report(),
+        "claims_eval": claims_report(items)
+    }
+
+    print(f"escalation band {nli_escalation_band}")
+    summary("curated", report["curated"])
+    summary("claims", report["claims_eval"])
+
+    REPORT_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(REPORT_FILE, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
@@ -0,0 +1,67 @@
+import json
+import time
+from pathlib import Path
+
+from app import claim_pipeline, reranker, stance_classifier
+from app.claim_pipeline import claim_wrapper, decompose_claim
+
+EVAL_FILE = Path(__file__).resolve().parent.parent / "claim_pipeline_eval" / "claims_eval.json"
+OUTPUT_FILE = Path(__file__).resolve().parent.parent / "claim_pipeline_eval" / "rerank_cascade_results.json"
+MODES = ["l6", "cascade", "l12"]
+REFERENCE = "l12"
+
+def load_eval(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def run_mode(items, decompositions, mode):
+    reranker.rerank_mode = mode
+    # with the persistent NLI cache on, whichever mode ran first would pay for
+    # every NLI call and the others would read its scores back
+    stance_classifier.nli_cache = False
+    verdicts = []
+    seconds = 0.0
+    for item in items:
+        # cold score cache: every mode pays for its own cross-encoder calls
+        reranker.score_cache.clear()
+        claim_pipeline.decompose_claim = lambda claim: decompositions[claim]
+        start = time.perf_counter()
+        result = claim_wrapper(item["claim"])
+        seconds += time.perf_counter() - start
+        verdicts.append(result["verdict"])
+    return seconds, verdicts
+
+if __name__ == "__main__":
+    items = load_eval(EVAL_FILE)
+    # decomposition would blur the reranker's share of latency
+    decompositions = {item["claim"]: decompose_claim(item["claim"]) for item in items}
+
+    # warm up every model and the retrieval caches for every claim, so the
+    # timed runs differ only in reranking whatever order they run in
+    for mode in MODES:
+        run_mode(items, decompositions, mode)
+
+    results = {}
+    for mode in MODES:
+        seconds, verdicts = run_mode(items, decompositions, mode)
+        expected = [item["expected_final_verdict"] for item in items]
+        results[mode] = {
+            "total_s": seconds,
+            "per_claim_ms": 1000 * seconds / len(items),
+            "accuracy": sum(v == e for v, e in zip(verdicts, expected)) / len(items),
+            "verdicts": verdicts
+        }
+
+    reference = results[REFERENCE]["verdicts"]
+    print(f"{len(items)} claims, cascade_fraction={reranker.cascade_fraction}, "
+          f"cascade_margin={reranker.cascade_margin}")
+    for mode in MODES:
+        r = results[mode]
+        r["agreement_with_l12"] = sum(a == b for a, b in zip(r["verdicts"], reference)) / len(items)
+        print(
+            f"{mode:8s} {r['per_claim_ms']:8.1f} ms/claim | accuracy {r['accuracy']:.3f} | "
+            f"agrees with L12 {r['agreement_with_l12']:.3f}"
+        )
+
+    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
@@ -0,0 +1,60 @@
+import random
+import time
+
+import numpy as np
+
+from app.config import ms_marco_6
+from app.model_registry import get_model
+from app.reranker import score_cache, score_pairs
+
+NUM_QUERIES = 20
+CANDIDATES_PER_QUERY = 100
+MIN_WORDS = 5
+MAX_WORDS = 100
+REPEATS = 3
+
+VOCAB = (
+    "vaccine climate carbon emissions study patients trial results economy growth "
+    "inflation policy government election court ruling data model accuracy energy "
+    "solar wind coal water river temperature increase decrease report percent"
+).split()
+
+def synthetic_pairs(rng):
+    # sentence lengths spread over 5-100 words like the corpus
+    pairs = []
+    for _ in range(NUM_QUERIES):
+        query = " ".join(rng.choices(VOCAB, k=rng.randint(6, 15)))
+        for _ in range(CANDIDATES_PER_QUERY):
+            words = rng.randint(MIN_WORDS, MAX_WORDS)
+            pairs.append((query, " ".join(rng.choices(VOCAB, k=words)) + "."))
+    return pairs
+
+def best_of(fn):
+    best = None
+    out = None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        out = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, out
+
+def uncached():
+    score_cache.clear()
+    return score_pairs(pairs)
+
+if __name__ == "__main__":
+    pairs = synthetic_pairs(random.Random(0))
+    model = get_model(ms_marco_6)
+    model.predict(pairs[:32], show_progress_bar=False)  # warm up
+
+    naive_s, naive = best_of(lambda: np.asarray(model.predict(pairs, show_progress_bar=False)))
+    bucketed_s, bucketed = best_of(uncached)
+    cached_s, cached = best_of(lambda: score_pairs(pairs))
+
+    n = len(pairs)
+    print(f"{n} pairs ({NUM_QUERIES} queries x {CANDIDATES_PER_QUERY} candidates)")
+    print(f"default predict   {naive_s:.3f}s  {n / naive_s:8.1f} pairs/s")
+    print(f"length-bucketed   {bucketed_s:.3f}s  {n / bucketed_s:8.1f} pairs/s  x{naive_s / bucketed_s:.2f}")
+    print(f"fully cached      {cached_s:.4f}s  {n / cached_s:8.1f} pairs/s")
+    print(f"max |score diff|  {np.abs(naive - bucketed).max():.2e}")
@@ -0,0 +1,91 @@
+import json
+import time
+from pathlib import Path
+
+from app import reranker, search, stance_classifier
+from app.claim_pipeline import decompose_claim, verify_subclaims
+
+EVAL_FILE = Path(__file__).resolve().parent.parent / "claim_pipeline_eval" / "claims_eval.json"
+MODES = ["sequential", "batched", "parallel"]
+REPEATS = 3
+
+def load_claims(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [item["claim"] for item in json.load(f)]
+
+def clear_caches():
+    # every mode and repeat has to do its own retrieval and inference
+    search.result_cache.clear()
+    search.query_cache.cache.clear()
+    reranker.score_cache.clear()
+
+def time_mode(subclaims, mode):
+    best = None
+    results = None
+    for _ in range(REPEATS):
+        clear_caches()
+        start = time.perf_counter()
+        results = verify_subclaims(subclaims, mode=mode)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, results
+
+def signature(results):
+    return [(r["verdict"], r["controversial"]) for r in results]
+
+def run_benchmark(claims):
+    rows = []
+    for claim in claims:
+        # decomposition is shared so only verification is timed
+        subclaims = decompose_claim(claim)
+        if len(subclaims) < 2:
+            continue
+
+        timings = {}
+        outputs = {}
+        for mode in MODES:
+            timings[mode], outputs[mode] = time_mode(subclaims, mode)
+
+        rows.append({
+            "claim": claim,
+            "num_subclaims": len(subclaims),
+            "sequential_s": timings["sequential"],
+            "batched_s": timings["batched"],
+            "parallel_s": timings["parallel"],
+            "speedup": timings["sequential"] / timings["batched"],
+            "parallel_speedup": timings["sequential"] / timings["parallel"],
+            "verdicts_match": all(
+                signature(outputs[mode]) == signature(outputs["sequential"]) for mode in MODES
+            )
+        })
+
+        print(
+            f"{len(subclaims)} subclaims | sequential {timings['sequential']:.3f}s | "
+            f"batched {timings['batched']:.3f}s (x{rows[-1]['speedup']:.2f}) | "
+            f"parallel {timings['parallel']:.3f}s (x{rows[-1]['parallel_speedup']:.2f}) | "
+            f"match={rows[-1]['verdicts_match']}"
+        )
+
+    return rows
+
+if __name__ == "__main__":
+    claims = load_claims(EVAL_FILE)
+    stance_classifier.nli_cache = False
+
+    # warm up every model so the first timed claim is not a cold start
+    verify_subclaims(decompose_claim(claims[0]), mode="batched")
+
+    rows = run_benchmark(claims)
+    if not rows:
+        print("No multi-subclaim claims found")
+    else:
+        total_seq = sum(r["sequential_s"] for r in rows)
+        total_batch = sum(r["batched_s"] for r in rows)
+        total_parallel = sum(r["parallel_s"] for r in rows)
+        print("\nMULTI-SUBCLAIM CLAIMS:", len(rows))
+        print("TOTAL SEQUENTIAL:", round(total_seq, 3), "s")
+        print("TOTAL BATCHED:", round(total_batch, 3), "s")
+        print("TOTAL PARALLEL:", round(total_parallel, 3), "s")
+        print("OVERALL SPEEDUP:", round(total_seq / total_batch, 2))
+        print("OVERALL PARALLEL SPEEDUP:", round(total_seq / total_parallel, 2))
+        print("VERDICT AGREEMENT:", sum(r["verdicts_match"] for r in rows), "/", len(rows))
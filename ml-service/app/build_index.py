@@ -1,44 +1,327 @@
+import hashlib
 import json
+import logging
+import os
+import shutil
+import threading
+import time
 from pathlib import Path
 
 import numpy as np
 import faiss
-from sentence_transformers import SentenceTransformer
 from sklearn.preprocessing import normalize
 
-from .config import metas_file, faiss_index, gte, M
+from .config import (
+    metas_file, faiss_index, faiss_wal, gte, M, efConstruction, efSearch,
+    index_type, ivf_nlist, ivf_nprobe, pq_m, pq_nbits, index_train_size,
+    wal_checkpoint_bytes, wal_checkpoint_seconds,
+    index_build_dir, build_chunk_size,
+    embedding_cache_dir, embedding_cache_dtype
+)
+from .embedding_cache import EmbeddingCache
+from .model_registry import get_model, inference_lock
+from .index_wal import IndexWAL
+from .utils.file_lock import durable_write_text
+
+logger = logging.getLogger(__name__)
 
-model = SentenceTransformer(gte)
 index = None
+wal = IndexWAL(faiss_wal)
+embedding_cache = EmbeddingCache(embedding_cache_dir, gte, dtype=embedding_cache_dtype)
+
+_index_lock = threading.RLock()
+_last_checkpoint = time.monotonic()
+# bumped whenever the vectors behind `index` change, so anything derived
+# from search results can tell they are stale
+index_generation = 0
+
+def _bump_generation():
+    global index_generation
+    with _index_lock:
+        index_generation += 1
+
+def get_index_generation():
+    return index_generation
+
+def _encode(texts, show_progress_bar=False):
+    # only sentences missing from the embedding cache reach the encoder
+    def encode_fn(missing):
+        model = get_model(gte)
+        with inference_lock(gte):
+            embeddings = model.encode(missing, show_progress_bar=show_progress_bar)
+        return normalize(embeddings, norm="l2").astype("float32")
+
+    return embedding_cache.encode(texts, encode_fn)
+
+def _write_index(index):
+    tmp_path = str(faiss_index) + ".tmp"
+    faiss.write_index(index, tmp_path)
+    Path(tmp_path).replace(faiss_index)
+
+def checkpoint_faiss_index():
+    global _last_checkpoint
+
+    with _index_lock:
+        if index is None:
+            return
+        _write_index(index)
+        # only drop the log once the checkpoint that contains it is in place
+        wal.reset()
+        _last_checkpoint = time.monotonic()
+
+def _checkpoint_due():
+    if wal.size() >= wal_checkpoint_bytes:
+        return True
+    return time.monotonic() - _last_checkpoint >= wal_checkpoint_seconds
+
+INDEX_FACTORY = {
+    "hnsw_flat": "HNSW{M},Flat",
+    "hnsw_sq8": "HNSW{M},SQ8",
+    "hnsw_fp16": "HNSW{M},SQfp16",
+    "ivf_pq": "IVF{nlist},PQ{pq_m}x{pq_nbits}",
+    "ivf_hnsw": "IVF{nlist}_HNSW{M},SQ8",
+}
+
+def base_index(index):
+    if isinstance(index, faiss.IndexIDMap):
+        return faiss.downcast_index(index.index)
+    return faiss.downcast_index(index)
+
+def apply_search_defaults(index):
+    base = base_index(index)
+    if hasattr(base, "hnsw"):
+        base.hnsw.efSearch = efSearch
+    if hasattr(base, "nprobe"):
+        base.nprobe = ivf_nprobe
+        quantizer = faiss.downcast_index(base.quantizer)
+        if hasattr(quantizer, "hnsw"):
+            quantizer.hnsw.efSearch = max(efSearch, ivf_nprobe)
+    return index
+
+def search_params(index, value, sel=None):
+    # per-call parameters leave the shared index untouched, so concurrent
+    # searches can use different settings
+    base = base_index(index)
+    if hasattr(base, "hnsw"):
+        params = faiss.SearchParametersHNSW(efSearch=int(value))
+        refs = []
+    elif hasattr(base, "nprobe"):
+        params = faiss.SearchParametersIVF(nprobe=int(value))
+        refs = []
+        if hasattr(faiss.downcast_index(base.quantizer), "hnsw"):
+            quantizer_params = faiss.SearchParametersHNSW(efSearch=max(int(value), efSearch))
+            params.quantizer_params = quantizer_params
+            refs.append(quantizer_params)
+    else:
+        params = faiss.SearchParameters()
+        refs = []
+
+    if sel is not None:
+        params.sel = sel
+        refs.append(sel)
+    # faiss does not keep the python objects alive on its own
+    params.referenced_objects = refs
+    return params
+
+# FAISS k-means wants at least this many training vectors per centroid
+MIN_POINTS_PER_CENTROID = 39
+
+def _sized_by_sample(kind):
+    # IVF kinds pick nlist from the training sample, so they can only be
+    # created once it is collected; other kinds may still need training
+    # (SQ8 learns its value ranges), which is_trained tells
+    return "{nlist}" in INDEX_FACTORY[kind]
+
+def _nlist(kind, train_rows):
+    # ivf_nlist is an upper bound: small corpora get fewer lists rather than
+    # a k-means run with more centroids than training vectors
+    nlist = min(ivf_nlist, max(1, train_rows // MIN_POINTS_PER_CENTROID))
+    if nlist < ivf_nlist:
+        logger.warning(f"Only {train_rows} training vectors, using nlist={nlist} instead of {ivf_nlist}")
+    if kind == "ivf_pq" and train_rows < 2 ** pq_nbits:
+        raise ValueError(
+            f"ivf_pq with pq_nbits={pq_nbits} needs at least {2 ** pq_nbits} "
+            f"training vectors, got {train_rows}"
+        )
+    return nlist
+
+def _new_index(d, kind=None, train_rows=None):
+    # trained index types size their coarse quantizer from train_rows
+    if kind is None:
+        kind = index_type
+    if kind not in INDEX_FACTORY:
+        raise ValueError(f"Unknown index type: {kind}")
+
+    nlist = ivf_nlist
+    if _sized_by_sample(kind):
+        if train_rows is None:
+            raise ValueError(f"{kind} index needs the number of training vectors")
+        nlist = _nlist(kind, train_rows)
+
+    spec = INDEX_FACTORY[kind].format(M=M, nlist=nlist, pq_m=pq_m, pq_nbits=pq_nbits)
+    base = faiss.index_factory(d, spec, faiss.METRIC_INNER_PRODUCT)
+    if hasattr(base, "hnsw"):
+        base.hnsw.efConstruction = efConstruction
+
+    return apply_search_defaults(faiss.IndexIDMap(base))
+
+def _fit_index(d, kind, sample, new_index=None):
+    # creates the index unless given one, then trains it if faiss needs that
+    if new_index is None:
+        new_index = _new_index(d, kind, train_rows=len(sample))
+    if not new_index.is_trained:
+        logger.info(f"Training {kind} index on {len(sample)} vectors")
+        new_index.train(np.ascontiguousarray(sample))
+    return new_index
+
+def _train(shards, d, kind, new_index=None):
+    # trained index types learn their quantizers from the first shards
+    sample = []
+    rows = 0
+    for shard in shards:
+        embeddings = np.load(index_build_dir / (shard + ".emb.npy"), mmap_mode="r")
+        take = min(len(embeddings), index_train_size - rows)
+        sample.append(np.asarray(embeddings[:take]))
+        rows += take
+        if rows >= index_train_size:
+            break
+
+    return _fit_index(d, kind, np.concatenate(sample), new_index)
+
+def _prefix_digest(offset):
+    # hash of the metadata bytes consumed so far; a build only resumes on
+    # the exact file it started from
+    digest = hashlib.blake2b(digest_size=16)
+    with open(metas_file, "rb") as f:
+        remaining = offset
+        while remaining:
+            block = f.read(min(remaining, 1 << 20))
+            if not block:
+                break
+            digest.update(block)
+            remaining -= len(block)
+    return digest
+
+def _load_build_progress():
+    # returns (progress, digest of metas.jsonl up to progress["offset"])
+    progress_file = index_build_dir / "progress.json"
+    if progress_file.exists():
+        with open(progress_file, "r", encoding="utf-8") as f:
+            progress = json.load(f)
+        size = metas_file.stat().st_size
+        if progress.get("metas") == str(metas_file) and progress["offset"] <= size:
+            digest = _prefix_digest(progress["offset"])
+            if progress.get("digest") == digest.hexdigest():
+                return progress, digest
+        logger.warning("Discarding index build progress for a different metadata file")
+
+    if index_build_dir.exists():
+        shutil.rmtree(index_build_dir)
+    index_build_dir.mkdir(parents=True, exist_ok=True)
+    return {"metas": str(metas_file), "offset": 0, "shards": []}, hashlib.blake2b(digest_size=16)
+
+def _save_shard(shard_no, ids, embeddings):
+    name = f"shard_{shard_no:05d}"
+    for suffix, arr in ((".ids.npy", ids), (".emb.npy", embeddings)):
+        tmp = index_build_dir / (name + suffix + ".tmp")
+        with open(tmp, "wb") as f:
+            np.save(f, arr)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, index_build_dir / (name + suffix))
+    return name
+
+def _read_chunks(offset, digest):
+    # digest is extended with every line consumed
+    with open(metas_file, "rb") as f:
+        f.seek(offset)
+        texts, ids = [], []
+        while True:
+            line = f.readline()
+            if not line.endswith(b"\n"):
+                # EOF, or a row still being written
+                break
+            digest.update(line)
+            if line.strip():
+                data = json.loads(line)
+                texts.append(data["sentence"])
+                ids.append(int(data["id"]))
+            if len(texts) >= build_chunk_size:
+                yield texts, ids, f.tell()
+                texts, ids = [], []
+        if texts:
+            yield texts, ids, f.tell()
+
+def _add_shards(new_index, shards):
+    for shard in shards:
+        ids = np.load(index_build_dir / (shard + ".ids.npy"))
+        embeddings = np.load(index_build_dir / (shard + ".emb.npy"), mmap_mode="r")
+        new_index.add_with_ids(np.ascontiguousarray(embeddings), ids)
 
 def initialize_faiss_index():
+    # Streams metas.jsonl in build_chunk_size shards. Each encoded shard is
+    # saved under index_build_dir before progress.json moves past it, so an
+    # interrupted build re-adds finished shards from disk and resumes
+    # encoding at the first unfinished one.
     global index
 
-    texts = []
-    ids = []
+    kind = index_type
+    progress, digest = _load_build_progress()
+    new_index = None
+    dim = None
+    # shards held back until an untrained index has seen enough vectors;
+    # IVF indexes are only created once the training sample size is known
+    pending = []
+    pending_rows = 0
 
-    with open(metas_file, "r", encoding="utf-8") as f:
-        for line in f:
-            data = json.loads(line)
-            texts.append(data["sentence"])
-            ids.append(int(data["id"]))
+    def _flush():
+        nonlocal new_index, pending, pending_rows
+        if new_index is None or not new_index.is_trained:
+            new_index = _train(pending, dim, kind, new_index)
+        _add_shards(new_index, pending)
+        pending, pending_rows = [], 0
 
-    if not texts:
-        raise ValueError("Metadata file is empty, cannot build FAISS index")
+    def _queue(shard, rows, d):
+        nonlocal new_index, dim, pending_rows
+        dim = d
+        if new_index is None and not _sized_by_sample(kind):
+            new_index = _new_index(d, kind)
+        pending.append(shard)
+        pending_rows += rows
+        if (new_index is not None and new_index.is_trained) or pending_rows >= index_train_size:
+            _flush()
 
-    embeddings = model.encode(texts, show_progress_bar=True)
-    embeddings = normalize(embeddings, norm="l2").astype("float32")
+    for shard in progress["shards"]:
+        embeddings = np.load(index_build_dir / (shard + ".emb.npy"), mmap_mode="r")
+        _queue(shard, embeddings.shape[0], embeddings.shape[1])
 
-    d = embeddings.shape[1]
+    if progress["shards"]:
+        logger.info(f"Resumed index build after {len(progress['shards'])} shards")
 
-    base_index = faiss.IndexHNSWFlat(d, M, faiss.METRIC_INNER_PRODUCT)
-    index = faiss.IndexIDMap(base_index)
+    for texts, ids, end in _read_chunks(progress["offset"], digest):
+        embeddings = _encode(texts, show_progress_bar=True)
+        ids = np.array(ids, dtype=np.int64)
 
-    index.add_with_ids(embeddings, np.array(ids, dtype=np.int64))
+        shard = _save_shard(len(progress["shards"]), ids, embeddings)
+        progress["shards"].append(shard)
+        progress["offset"] = end
+        progress["digest"] = digest.hexdigest()
+        durable_write_text(index_build_dir / "progress.json", json.dumps(progress))
 
-    tmp_path = str(faiss_index) + ".tmp"
-    faiss.write_index(index, tmp_path)
-    Path(tmp_path).replace(faiss_index)
+        _queue(shard, embeddings.shape[0], embeddings.shape[1])
+
+    if pending:
+        _flush()
+    if new_index is None:
+        raise ValueError("Metadata file is empty, cannot build FAISS index")
+
+    with _index_lock:
+        index = new_index
+        _bump_generation()
+        checkpoint_faiss_index()
+
+    shutil.rmtree(index_build_dir, ignore_errors=True)
+    logger.info(f"Embedding cache: {embedding_cache.stats()}")
 
 def get_faiss_index():
     global index
@@ -46,10 +329,19 @@ def get_faiss_index():
     if index is not None:
         return index
 
-    if Path(faiss_index).exists():
-        index = faiss.read_index(str(faiss_index))
-    else:
-        initialize_faiss_index()
+    with _index_lock:
+        if index is not None:
+            return index
+
+        if Path(faiss_index).exists():
+            loaded = apply_search_defaults(faiss.read_index(str(faiss_index)))
+            replayed = wal.replay(loaded)
+            if replayed:
+                logger.info(f"Replayed {replayed} vectors from {faiss_wal}")
+            index = loaded
+            _bump_generation()
+        else:
+            initialize_faiss_index()
 
     return index
 
@@ -64,11 +356,16 @@ def add_faiss_index(metadata):
     texts = [m["sentence"] for m in metadata]
     ids = np.array([int(m["id"]) for m in metadata], dtype=np.int64)
 
-    embeddings = model.encode(texts, show_progress_bar=False)
-    embeddings = normalize(embeddings, norm="l2").astype("float32")
+    embeddings = _encode(texts)
 
-    index.add_with_ids(embeddings, ids)
+    with _index_lock:
+        wal.append(ids, embeddings)
+        index.add_with_ids(embeddings, ids)
+        _bump_generation()
 
-    tmp_path = str(faiss_index) + ".tmp"
-    faiss.write_index(index, tmp_path)
-    Path(tmp_path).replace(faiss_index)
+        if _checkpoint_due():
+            checkpoint_faiss_index()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    initialize_faiss_index()
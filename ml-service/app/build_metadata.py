@@ -12,7 +12,9 @@ import re
 from .build_index import add_faiss_index
 from .config import metas_file, local_dir, ingested_dir
 from .schemas import SuccessResponse, ErrorResponse
-from .search import load_id_to_meta
+from .id_allocator import IdAllocator
+from . import lexical_index
+from .search import append_id_to_meta, start_meta_consistency_check
 
 nlp = spacy.blank("en")
 nlp.add_pipe("sentencizer")
@@ -23,6 +25,7 @@ _metadata_lock = threading.Lock()
 
 doc_index_file = ingested_dir / "doc_index.json"
 next_id_file = ingested_dir / "next_id.txt"
+_id_allocator = IdAllocator(next_id_file)
 
 def _load_doc_index():
     if doc_index_file.exists():
@@ -38,14 +41,7 @@ def _file_hash(text):
     return hashlib.sha256(text.encode("utf-8")).hexdigest()
 
 def get_new_id():
-    with _metadata_lock:
-        if not next_id_file.exists():
-            next_id_file.parent.mkdir(parents=True, exist_ok=True)
-            next_id_file.write_text("1")
-            return 0
-        curr = int(next_id_file.read_text())
-        next_id_file.write_text(str(curr + 1))
-        return curr
+    return _id_allocator.reserve(1)
 
 def build_metadata(content, file_name, file_type, source_type,
                     credibility, extra_meta=None, already_split=False):
@@ -81,10 +77,13 @@ def build_metadata(content, file_name, file_type, source_type,
 
         clean_sentences.append(s)
 
+    # one durable reservation covers every sentence of the document
+    first_id = _id_allocator.reserve(len(clean_sentences)) if clean_sentences else 0
+
     metadata = []
     for pos, sent in enumerate(clean_sentences):
         metadata.append({
-            "id": get_new_id(),
+            "id": first_id + pos,
             "doc_id": file_name,
             "file_type": file_type,
             "position": pos,
@@ -99,12 +98,19 @@ def build_metadata(content, file_name, file_type, source_type,
         if metadata:
             metas_file.parent.mkdir(parents=True, exist_ok=True)
             with _metadata_lock:
-                with open(metas_file, "a", encoding="utf-8") as f:
+                with open(metas_file, "ab") as f:
+                    start = f.tell()
                     for row in metadata:
-                        f.write(json.dumps(row, ensure_ascii=False) + "\n")
+                        f.write((json.dumps(row, ensure_ascii=False) + "\n").encode("utf-8"))
+                    end = f.tell()
 
             add_faiss_index(metadata)
-            load_id_to_meta(force_reload=True)
+            if lexical_index.available():
+                lexical_index.add_documents(metadata)
+            # last, so cached search results are invalidated once all of the
+            # new sentences are searchable
+            append_id_to_meta(metadata, start, end)
+            start_meta_consistency_check()
 
         logger.info(f"Successfully processed {file_name}: {len(metadata)} sentences extracted")
         return metadata, None
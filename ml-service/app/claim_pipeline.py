@@ -1,8 +1,10 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from types import SimpleNamespace
 from math import ceil
 
 from .config import *
-from .subclaim_pipeline import run_subclaim_pipeline
+from .subclaim_pipeline import run_subclaim_pipeline, run_subclaim_pipeline_batch
 from .llm_decomposer import llm_decomposer
 from .rule_decomposer import rule_decompose
 
@@ -15,6 +17,27 @@ MIXED_NEGATIVE_MIN = 0.30
 
 alpha = 0.3
 
+# "sequential" verifies one subclaim at a time, "batched" retrieves for all
+# subclaims first and scores every evidence pair in one reranker/NLI pass,
+# "parallel" runs the per-subclaim pipelines concurrently on a bounded pool
+SUBCLAIM_MODE = "batched"
+SUBCLAIM_MODES = ("sequential", "batched", "parallel")
+# streamed verification reports each subclaim as soon as it is done, which
+# only helps when they do not all finish together
+STREAM_SUBCLAIM_MODE = "parallel"
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=subclaim_workers, thread_name_prefix="subclaim"
+            )
+        return _executor
+
 NEGATIVE_KEYS = {
     "cost", "overhead", "energy", "instability", "unstable", "diminishing",
     "limitation", "limitations", "challenge", "challenges", "complexity",
@@ -137,7 +160,7 @@ def build_subclaim_explanation(res):
         }
     }
 
-def claim_wrapper(claim: str):
+def decompose_claim(claim: str):
     subclaims = []
     subclaims_meta = llm_decomposer(claim)
 
@@ -154,10 +177,47 @@ def claim_wrapper(claim: str):
         else:
             subclaims = [SimpleNamespace(text=claim)]
 
-    subclaim_results = []
-    for sc in subclaims:
-        subclaim_results.append(run_subclaim_pipeline(sc))
-
+    return subclaims
+
+def check_mode(mode):
+    if mode is None:
+        mode = SUBCLAIM_MODE
+    if mode not in SUBCLAIM_MODES:
+        raise ValueError(f"Unknown subclaim mode: {mode}")
+    return mode
+
+def iter_subclaim_results(subclaims, mode=None, tier=None, filters=None):
+    # yields (index, result) as each subclaim finishes: in order for
+    # "sequential" and "batched", in completion order for "parallel"
+    mode = check_mode(mode)
+
+    if mode == "batched":
+        results = run_subclaim_pipeline_batch(subclaims, tier=tier, filters=filters)
+        yield from enumerate(results)
+    elif mode == "sequential" or len(subclaims) < 2:
+        for i, sc in enumerate(subclaims):
+            yield i, run_subclaim_pipeline(sc, tier=tier, filters=filters)
+    else:
+        executor = _get_executor()
+        futures = {
+            executor.submit(run_subclaim_pipeline, sc, tier=tier, filters=filters): i
+            for i, sc in enumerate(subclaims)
+        }
+        try:
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        finally:
+            # a caller that stops listening should not keep the pool busy
+            for future in futures:
+                future.cancel()
+
+def verify_subclaims(subclaims, mode=None, tier=None, filters=None):
+    results = [None] * len(subclaims)
+    for i, res in iter_subclaim_results(subclaims, mode=mode, tier=tier, filters=filters):
+        results[i] = res
+    return results
+
+def decide_final_verdict(subclaim_results):
     agg = aggregate_signals(subclaim_results)
     hard_contradict = check_hard_contradict(subclaim_results)
     n = agg["num_subclaims"]
@@ -203,6 +263,11 @@ def claim_wrapper(claim: str):
     else:
         final_verdict = "INCONCLUSIVE"
 
+    return final_verdict
+
+def build_claim_result(claim, subclaim_results):
+    verdict = decide_final_verdict(subclaim_results)
+
     sections = {
         "SUPPORTED_ASPECTS": [],
         "CONTRADICTED_ASPECTS": [],
@@ -230,21 +295,50 @@ def claim_wrapper(claim: str):
                 "items": v
             })
 
-    if final_verdict == "SUPPORT":
+    if verdict == "SUPPORT":
         summary = "The claim is generally supported by the available evidence, with some limitations."
-    elif final_verdict == "CONTRADICT":
+    elif verdict == "CONTRADICT":
         summary = "The claim is contradicted by strong evidence."
-    elif final_verdict == "MIXED":
+    elif verdict == "MIXED":
         summary = "The evidence presents both benefits and limitations."
     else:
         summary = "There is not enough strong evidence to reach a clear conclusion."
 
     return {
         "claim": claim,
-        "verdict": final_verdict,
+        "verdict": verdict,
         "explanation": {
             "summary": summary,
             "sections": explanation_sections
         },
         "subclaims": subclaim_results
     }
+
+def claim_wrapper_stream(claim: str, mode=None, tier=None, filters=None):
+    # Events, in order:
+    #   {"event": "decomposition", "claim", "subclaims": [text, ...]}
+    #   {"event": "subclaim", "index", "result"}   one per subclaim, as it finishes
+    #   {"event": "final", "result"}               what claim_wrapper returns
+    # the mode is checked here so a bad one fails before anything is streamed
+    mode = check_mode(mode)
+    return _stream(claim, mode, tier, filters)
+
+def _stream(claim, mode, tier, filters):
+    subclaims = decompose_claim(claim)
+    yield {
+        "event": "decomposition",
+        "claim": claim,
+        "subclaims": [sc.text for sc in subclaims]
+    }
+
+    subclaim_results = [None] * len(subclaims)
+    for i, res in iter_subclaim_results(subclaims, mode=mode, tier=tier, filters=filters):
+        subclaim_results[i] = res
+        yield {"event": "subclaim", "index": i, "result": res}
+
+    yield {"event": "final", "result": build_claim_result(claim, subclaim_results)}
+
+def claim_wrapper(claim: str, mode=None, tier=None, filters=None):
+    for event in claim_wrapper_stream(claim, mode=mode, tier=tier, filters=filters):
+        pass
+    return event["result"]
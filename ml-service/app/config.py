@@ -11,17 +11,81 @@ M = 32
 efConstruction = 200
 efSearch = 64
 
+# FAISS index layout: "hnsw_flat", "hnsw_sq8", "hnsw_fp16", "ivf_pq" or
+# "ivf_hnsw" (IVF with an HNSW coarse quantizer over SQ8 codes)
+index_type = "hnsw_flat"
+ivf_nlist = 4096
+ivf_nprobe = 32
+pq_m = 64
+pq_nbits = 8
+# vectors collected before training quantizers of trained index types
+index_train_size = 200000
+
+# efSearch (HNSW) or nprobe (IVF) per search tier; app.search_tiers can
+# calibrate these against measured recall into search_tiers_file
+search_tiers = {"interactive": 32, "balanced": 64, "exhaustive": 256}
+default_search_tier = "balanced"
+
+# fuse BM25 hits into dense results (reciprocal rank fusion); needs the
+# lexical index from `python -m app.lexical_index`. Off by default; check
+# app.benchmarks.bench_hybrid_retrieval on your corpus before enabling it.
+# /search callers can still ask for it per request
+hybrid_search = False
+rrf_k = 60
+
+# query embeddings kept in memory; persisted to query_cache_file across
+# restarts when query_cache_persist is set
+query_cache_size = 10000
+query_cache_persist = False
+
+# finished search results, tagged with the index generation they were
+# computed against; bounded by entries and by approximate size
+result_cache_size = 4096
+result_cache_max_bytes = 64 * 1024 * 1024
+
+# checkpoint the full index once the WAL or the time since the last
+# checkpoint passes either limit
+wal_checkpoint_bytes = 512 * 1024 * 1024
+wal_checkpoint_seconds = 3600
+
+# sentences encoded and persisted per shard during a full index build
+build_chunk_size = 20000
+embedding_cache_dtype = "float16"
+
 mpnet_base = cfg["mpnet-base"]
 e5 = cfg["E5-large"]
 gte = cfg["gte-large"]
 ms_marco_6 = cfg["ms-marco-6"]
 ms_marco_12 = cfg["ms-marco-12"]
 roberta_large = cfg["roberta-large"]
+bart_large_mnli = cfg.get("bart-large-mnli", "facebook/bart-large-mnli")
+# local distilled MNLI checkpoint, first stage of the NLI cascade
+small_nli = str(BASE_DIR / cfg.get("small-nli-path", "models/distilroberta-base-mnli"))
 
 llama_8B = cfg["llama-8B"]
 
+# "torch", "onnx" or "onnx-int8" per model; ONNX exports are created under
+# onnx_dir the first time they are needed (see app.inference_backends)
+inference_backends = {
+    ms_marco_6: "torch",
+    ms_marco_12: "torch",
+    roberta_large: "torch",
+    small_nli: "torch",
+}
+# ONNX Runtime intra-op threads, 0 lets it decide
+onnx_threads = 0
+
 metas_file = BASE_DIR / cfg["metas_path"]
 faiss_index = BASE_DIR / cfg["faiss_index_path"]
+faiss_wal = Path(str(faiss_index) + ".wal")
+index_build_dir = BASE_DIR / cfg.get("index_build_path", "data/index_build/")
+embedding_cache_dir = BASE_DIR / cfg.get("embedding_cache_path", "data/embedding_cache/")
+meta_store_dir = BASE_DIR / cfg.get("meta_store_path", "data/meta_store/")
+search_tiers_file = BASE_DIR / cfg.get("search_tiers_path", "data/search_tiers.json")
+query_cache_file = BASE_DIR / cfg.get("query_cache_path", "data/query_cache.npz")
+nli_cache_file = BASE_DIR / cfg.get("nli_cache_path", "data/nli_cache.sqlite")
+onnx_dir = BASE_DIR / cfg.get("onnx_path", "data/onnx/")
+lexical_index_file = BASE_DIR / cfg.get("lexical_index_path", "data/lexical_index.sqlite")
 local_dir = BASE_DIR / cfg["local_files_path"]
 
 ingested_dir = BASE_DIR / cfg["ingested_files_path"]
@@ -31,6 +95,7 @@ ingested_raw_dir = BASE_DIR / cfg["ingested_raw_path"]
 ingested_cleaned_dir = BASE_DIR / cfg["ingested_cleaned_path"]
 
 topk = cfg.get("top_k", 100)
+meta_check_interval = 30
 
 label_eval_dir = BASE_DIR / cfg["label_eval_path"]
 label_test_file = BASE_DIR / cfg.get("label_test_file", cfg.get("label_test"))
@@ -55,3 +120,34 @@ support_threshold = 0.6
 contradict_threshold = 0.6
 delta = 0.2
 epsilon = 0.1
+
+nli_batch_size = 16
+# worker threads shared by all claims verified in "parallel" subclaim mode
+subclaim_workers = 4
+
+# HTTP service (app.server): pipeline threads, requests admitted at once
+# before answering 429, and the per-model micro-batchers that coalesce
+# encoder/reranker/NLI calls across requests
+server_workers = 16
+server_max_pending = 64
+batch_max_size = 64
+batch_max_wait_ms = 5
+batch_max_queue = 4096
+# cross-encoder pairs per predict call (length-sorted) and cached pair scores
+rerank_batch_size = 32
+rerank_cache_size = 200000
+# "l6", "l12" or "cascade": L6 scores every candidate and L12 re-scores the
+# top cascade_fraction (at least top_n) plus anything within
+# cascade_margin of the last one kept
+rerank_mode = "l6"
+cascade_fraction = 0.3
+cascade_margin = 1.0
+# persistent (model, subclaim, evidence) -> NLI probabilities cache
+nli_cache = True
+nli_cache_max_entries = 2000000
+nli_cache_write_batch = 256
+# "single" runs roberta-large on every pair; "cascade" scores every pair
+# with small_nli first and only sends pairs whose support or contradict
+# probability falls inside nli_escalation_band on to roberta-large
+stance_mode = "single"
+nli_escalation_band = (0.2, 0.8)
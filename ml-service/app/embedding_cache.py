@@ -0,0 +1,192 @@
+import hashlib
+import logging
+import re
+import threading
+import unicodedata
+from pathlib import Path
+
+import numpy as np
+
+from .utils.file_lock import file_lock
+
+logger = logging.getLogger(__name__)
+
+# On-disk sentence embedding cache for one encoder.
+#
+# Rows live in fixed-size shards: keys_NNNNN.bin holds 16-byte digests of
+# (model name, normalized sentence) and vectors_NNNNN.bin the matching
+# embeddings, row for row. The vector files carry no header, so each dtype
+# gets its own directory under the model's. Shards are only ever appended to and are read
+# through np.memmap, so several processes can share one cache directory.
+
+KEY_BYTES = 16
+SHARD_ROWS = 65536
+
+
+def normalize_text(text):
+    text = unicodedata.normalize("NFC", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _slug(name):
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", name)
+
+
+class EmbeddingCache:
+    def __init__(self, root, model_name, dtype="float16"):
+        self.model_name = model_name
+        self.dtype = np.dtype(dtype)
+        self.dir = Path(root) / _slug(model_name) / self.dtype.name
+        self.dim = None
+
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._rows = {}
+        self._shard_rows = []
+        self._maps = {}
+        self._loaded = False
+
+    def key(self, text):
+        h = hashlib.blake2b(digest_size=KEY_BYTES)
+        h.update(self.model_name.encode("utf-8"))
+        h.update(b"\0")
+        h.update(normalize_text(text).encode("utf-8"))
+        return h.digest()
+
+    def _keys_path(self, shard):
+        return self.dir / f"keys_{shard:05d}.bin"
+
+    def _vectors_path(self, shard):
+        return self.dir / f"vectors_{shard:05d}.bin"
+
+    def _refresh(self):
+        # pick up rows appended by this or another process since the last look
+        if not self._loaded:
+            self.dir.mkdir(parents=True, exist_ok=True)
+            dim_file = self.dir / "dim.txt"
+            if dim_file.exists():
+                self.dim = int(dim_file.read_text())
+            self._loaded = True
+
+        shard = max(len(self._shard_rows) - 1, 0)
+        while self._keys_path(shard).exists():
+            if shard < len(self._shard_rows):
+                known = self._shard_rows[shard]
+            else:
+                known = 0
+                self._shard_rows.append(0)
+
+            with open(self._keys_path(shard), "rb") as f:
+                f.seek(known * KEY_BYTES)
+                data = f.read()
+            rows = known + len(data) // KEY_BYTES
+
+            for row in range(known, rows):
+                offset = (row - known) * KEY_BYTES
+                self._rows[data[offset:offset + KEY_BYTES]] = (shard, row)
+            if rows != known:
+                self._shard_rows[shard] = rows
+                self._maps.pop(shard, None)
+            shard += 1
+
+    def _vectors(self, shard):
+        vectors = self._maps.get(shard)
+        if vectors is None:
+            vectors = np.memmap(
+                self._vectors_path(shard), dtype=self.dtype, mode="r",
+                shape=(self._shard_rows[shard], self.dim)
+            )
+            self._maps[shard] = vectors
+        return vectors
+
+    def _append(self, keys, vectors):
+        with file_lock(self.dir / ".lock"):
+            self._refresh()
+
+            # another thread or process may have stored some of these while
+            # they were being encoded
+            fresh = [i for i, k in enumerate(keys) if k not in self._rows]
+            if not fresh:
+                return
+            keys = [keys[i] for i in fresh]
+            vectors = vectors[fresh]
+
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+                (self.dir / "dim.txt").write_text(str(self.dim))
+
+            row_bytes = self.dim * self.dtype.itemsize
+            start = 0
+            while start < len(keys):
+                shard = max(len(self._shard_rows) - 1, 0)
+                if not self._shard_rows:
+                    self._shard_rows.append(0)
+                rows = self._shard_rows[shard]
+                if rows >= SHARD_ROWS:
+                    shard += 1
+                    rows = 0
+                    self._shard_rows.append(0)
+
+                take = min(SHARD_ROWS - rows, len(keys) - start)
+                chunk_keys = keys[start:start + take]
+                chunk_vectors = vectors[start:start + take].astype(self.dtype)
+
+                # vectors first: rows past the end of the keys file (left by a
+                # crash) are cut off before appending so the files stay aligned
+                with open(self._vectors_path(shard), "ab") as f:
+                    f.truncate(rows * row_bytes)
+                    f.write(chunk_vectors.tobytes())
+                with open(self._keys_path(shard), "ab") as f:
+                    f.truncate(rows * KEY_BYTES)
+                    f.write(b"".join(chunk_keys))
+
+                for i, k in enumerate(chunk_keys):
+                    self._rows[k] = (shard, rows + i)
+                self._shard_rows[shard] = rows + take
+                self._maps.pop(shard, None)
+                start += take
+
+    def encode(self, texts, encode_fn):
+        # encode_fn only sees the texts that are not cached yet
+        if not texts:
+            return np.zeros((0, self.dim or 0), dtype=np.float32)
+
+        keys = [self.key(t) for t in texts]
+
+        # the lock only covers the lookup and the insert; encoding the misses
+        # happens outside it so concurrent callers are not serialized
+        with self._lock:
+            self._refresh()
+
+            missing = {}
+            for k, t in zip(keys, texts):
+                if k not in self._rows and k not in missing:
+                    missing[k] = t
+
+        if missing:
+            encoded = np.asarray(encode_fn(list(missing.values())), dtype=np.float32)
+            with self._lock:
+                self._append(list(missing), encoded)
+
+        with self._lock:
+            out = np.empty((len(texts), self.dim), dtype=np.float32)
+            for i, k in enumerate(keys):
+                shard, row = self._rows[k]
+                out[i] = self._vectors(shard)[row]
+
+            self.misses += len(missing)
+            self.hits += len(texts) - len(missing)
+
+        return out
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "model": self.model_name,
+            "entries": len(self._rows),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0
+        }
@@ -0,0 +1,33 @@
+import threading
+from pathlib import Path
+
+from .utils.file_lock import file_lock, durable_write_text
+
+
+class IdAllocator:
+    # Hands out contiguous id blocks from a counter file. The new high-water
+    # mark is made durable before a block is returned, so a crash can leave
+    # a gap in the id space but never reissues an id.
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.lock_path = self.path.with_name(self.path.name + ".lock")
+        self._lock = threading.Lock()
+
+    def reserve(self, n=1):
+        if n < 1:
+            raise ValueError("n must be at least 1")
+
+        with self._lock, file_lock(self.lock_path):
+            if self.path.exists():
+                start = int(self.path.read_text().strip() or 0)
+            else:
+                start = 0
+            durable_write_text(self.path, str(start + n))
+            return start
+
+    def peek(self):
+        with self._lock, file_lock(self.lock_path):
+            if not self.path.exists():
+                return 0
+            return int(self.path.read_text().strip() or 0)
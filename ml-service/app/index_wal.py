@@ -0,0 +1,98 @@
+import logging
+import os
+import struct
+import zlib
+from pathlib import Path
+
+import numpy as np
+import faiss
+
+logger = logging.getLogger(__name__)
+
+# Append-only log of vectors added since the last index checkpoint.
+# Each record is
+#   b"WREC" | n uint32 | d uint32 | crc32 uint32 | ids int64[n] | vectors float32[n, d]
+# and is fsynced before add_faiss_index returns, so the on-disk index plus
+# the log always describes every acknowledged vector.
+
+MAGIC = b"WREC"
+HEADER = struct.Struct("<4sIII")
+
+
+class IndexWAL:
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def size(self):
+        return self.path.stat().st_size if self.path.exists() else 0
+
+    def append(self, ids, vectors):
+        ids = np.ascontiguousarray(ids, dtype=np.int64)
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        n, d = vectors.shape
+
+        payload = ids.tobytes() + vectors.tobytes()
+        record = HEADER.pack(MAGIC, n, d, zlib.crc32(payload)) + payload
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "ab") as f:
+            f.write(record)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def records(self):
+        if not self.path.exists():
+            return
+
+        with open(self.path, "rb") as f:
+            good = 0
+            while True:
+                header = f.read(HEADER.size)
+                if not header:
+                    break
+                if len(header) < HEADER.size:
+                    break
+                magic, n, d, crc = HEADER.unpack(header)
+                if magic != MAGIC:
+                    break
+                payload = f.read(n * 8 + n * d * 4)
+                if len(payload) < n * 8 + n * d * 4 or zlib.crc32(payload) != crc:
+                    break
+
+                ids = np.frombuffer(payload[:n * 8], dtype=np.int64)
+                vectors = np.frombuffer(payload[n * 8:], dtype=np.float32).reshape(n, d)
+                good = f.tell()
+                yield ids, vectors
+
+            end = f.seek(0, os.SEEK_END)
+
+        if good < end:
+            # torn write from a crash mid-append: that add was never acknowledged
+            logger.warning(f"Dropping {end - good} trailing bytes of {self.path}")
+            with open(self.path, "r+b") as f:
+                f.truncate(good)
+
+    def replay(self, index):
+        present = None
+        if hasattr(index, "id_map"):
+            present = faiss.vector_to_array(index.id_map)
+
+        replayed = 0
+        for ids, vectors in self.records():
+            # a crash between checkpoint and reset leaves already-indexed rows
+            if present is not None and len(present):
+                keep = ~np.isin(ids, present)
+                ids, vectors = ids[keep], vectors[keep]
+            if len(ids):
+                index.add_with_ids(vectors, ids)
+                replayed += len(ids)
+
+        return replayed
+
+    def reset(self):
+        if not self.path.exists():
+            return
+        with open(self.path, "r+b") as f:
+            f.truncate(0)
+            f.flush()
+            os.fsync(f.fileno())
@@ -0,0 +1,192 @@
+import logging
+import re
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+
+from .config import inference_backends, onnx_dir, onnx_threads
+from .utils.file_lock import file_lock
+
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
+
+logger = logging.getLogger(__name__)
+
+# CPU inference through ONNX Runtime for the sequence classifiers (the
+# cross-encoders and the NLI model). A model is exported with
+# torch.onnx.export the first time an ONNX backend asks for it, and the
+# int8 variant is derived from that export with dynamic quantization:
+#
+#   onnx_dir/<model>/model.onnx        fp32 export
+#   onnx_dir/<model>/model.int8.onnx   dynamically quantized weights
+#   onnx_dir/<model>/                  tokenizer and config files
+#
+# The wrappers mimic what the callers use of the PyTorch objects, so the
+# reranker and stance classifier do not know which backend they run on.
+
+BACKENDS = ("torch", "onnx", "onnx-int8")
+OPSET = 17
+
+
+def backend_for(name):
+    backend = inference_backends.get(name, "torch")
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend for {name}: {backend}")
+    return backend
+
+
+def _slug(name):
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", name)
+
+
+def model_dir(name, root=None):
+    return Path(root or onnx_dir) / _slug(name)
+
+
+def export_onnx(name, root=None):
+    import torch
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+    out = model_dir(name, root)
+    out.mkdir(parents=True, exist_ok=True)
+
+    tokenizer = AutoTokenizer.from_pretrained(name)
+    model = AutoModelForSequenceClassification.from_pretrained(name)
+    model.eval()
+
+    sample = tokenizer(
+        ["a premise sentence"], ["a hypothesis"], return_tensors="pt"
+    )
+    input_names = list(sample.keys())
+    dynamic_axes = {k: {0: "batch", 1: "sequence"} for k in input_names}
+    dynamic_axes["logits"] = {0: "batch"}
+
+    tmp = out / "model.onnx.tmp"
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[k] for k in input_names),
+            str(tmp),
+            input_names=input_names,
+            output_names=["logits"],
+            dynamic_axes=dynamic_axes,
+            opset_version=OPSET,
+            dynamo=False
+        )
+    tokenizer.save_pretrained(out)
+    model.config.save_pretrained(out)
+    tmp.replace(out / "model.onnx")
+    logger.info(f"Exported {name} to {out / 'model.onnx'}")
+    return out / "model.onnx"
+
+
+def quantize_int8(name, root=None):
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    out = model_dir(name, root)
+    tmp = out / "model.int8.onnx.tmp"
+    quantize_dynamic(str(out / "model.onnx"), str(tmp), weight_type=QuantType.QInt8)
+    tmp.replace(out / "model.int8.onnx")
+    logger.info(f"Quantized {name} to {out / 'model.int8.onnx'}")
+    return out / "model.int8.onnx"
+
+
+def ensure_exported(name, backend, root=None):
+    out = model_dir(name, root)
+    fp32 = out / "model.onnx"
+    int8 = out / "model.int8.onnx"
+    # several workers may start at once; only one of them exports
+    with file_lock(Path(root or onnx_dir) / (_slug(name) + ".lock")):
+        if not fp32.exists():
+            export_onnx(name, root)
+        if backend == "onnx-int8" and not int8.exists():
+            quantize_int8(name, root)
+    return int8 if backend == "onnx-int8" else fp32
+
+
+class OnnxSequenceClassifier:
+    def __init__(self, name, backend="onnx", root=None):
+        if ort is None:
+            raise ImportError("onnxruntime is required for the ONNX inference backends")
+        from transformers import AutoConfig, AutoTokenizer
+
+        path = ensure_exported(name, backend, root)
+        self.name = name
+        self.backend = backend
+        self.config = AutoConfig.from_pretrained(path.parent)
+        self.tokenizer = AutoTokenizer.from_pretrained(path.parent)
+        self.device = "cpu"
+
+        options = ort.SessionOptions()
+        if onnx_threads:
+            options.intra_op_num_threads = onnx_threads
+        self.session = ort.InferenceSession(
+            str(path), options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def logits(self, inputs):
+        feed = {
+            k: (v.cpu().numpy() if hasattr(v, "cpu") else np.asarray(v)).astype(np.int64)
+            for k, v in inputs.items()
+            if k in self.input_names
+        }
+        return self.session.run(["logits"], feed)[0]
+
+    def __call__(self, **inputs):
+        # stands in for the transformers model: model(**inputs).logits
+        import torch
+        return SimpleNamespace(logits=torch.from_numpy(self.logits(inputs)))
+
+    def eval(self):
+        return self
+
+
+class OnnxCrossEncoder(OnnxSequenceClassifier):
+    # the subset of sentence_transformers.CrossEncoder the reranker uses
+
+    def _activation(self, logits):
+        activation = getattr(self.config, "sentence_transformers", {}).get("activation_fn")
+        if activation is None:
+            activation = getattr(self.config, "sbert_ce_default_activation_function", None)
+        if activation is None and self.config.num_labels == 1:
+            activation = "Sigmoid"
+        if activation and "Sigmoid" in activation:
+            return 1.0 / (1.0 + np.exp(-logits))
+        return logits
+
+    def predict(self, pairs, batch_size=32, show_progress_bar=False, **kwargs):
+        if not pairs:
+            return np.zeros(0, dtype=np.float32)
+        max_length = min(self.tokenizer.model_max_length, 512)
+
+        scores = []
+        for start in range(0, len(pairs), batch_size):
+            batch = pairs[start:start + batch_size]
+            inputs = self.tokenizer(
+                [p[0] for p in batch],
+                [p[1] for p in batch],
+                truncation=True,
+                padding=True,
+                max_length=max_length,
+                return_tensors="np"
+            )
+            scores.append(self._activation(self.logits(inputs)))
+
+        scores = np.concatenate(scores)
+        if self.config.num_labels == 1:
+            scores = scores.reshape(-1)
+        return scores
+
+
+def load_cross_encoder(name, backend):
+    return OnnxCrossEncoder(name, backend)
+
+
+def load_sequence_classifier(name, backend):
+    # same (model, tokenizer) shape as the PyTorch NLI loader
+    model = OnnxSequenceClassifier(name, backend)
+    return model, model.tokenizer
@@ -1,11 +1,14 @@
 # Standalone auxiliary classifier (not used in final claim pipeline)
 
 from collections import defaultdict
-from transformers import pipeline
 import re
 from .config import *
+from .model_registry import get_model, inference_lock
 
-classifier = pipeline("zero-shot-classification", model="facebook/bart-large-mnli", device=0)
+def classifier(*args, **kwargs):
+    model = get_model(bart_large_mnli)
+    with inference_lock(bart_large_mnli):
+        return model(*args, **kwargs)
 
 
 health_regex = re.compile(r"\b(virus|covid|infection|antibiotic|cancer|therapy|symptom|vaccine|clinical trial|antiviral|biomarker|diagnostic)\b", re.I)
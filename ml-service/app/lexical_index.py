@@ -0,0 +1,166 @@
+import json
+import logging
+import math
+import re
+import sqlite3
+import threading
+from collections import Counter
+from pathlib import Path
+
+from .config import metas_file, lexical_index_file
+
+logger = logging.getLogger(__name__)
+
+# BM25 inverted index over metas.jsonl, stored in SQLite so it lives on
+# disk, is shared between processes and can be appended to per document.
+
+K1 = 1.2
+B = 0.75
+BUILD_BATCH = 10000
+
+# keeps numbers, versions and hyphenated names intact: "gpt-4", "3.5", "covid-19"
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:[.\-][a-z0-9]+)*")
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has",
+    "have", "in", "is", "it", "its", "of", "on", "or", "that", "the", "this",
+    "to", "was", "were", "which", "with"
+}
+
+_local = threading.local()
+_write_lock = threading.Lock()
+
+
+def tokenize(text):
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+def available(path=lexical_index_file):
+    return Path(path).exists()
+
+
+def _connect(path=lexical_index_file):
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    conn = conns.get(str(path))
+    if conn is None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(path), timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS postings (
+                term TEXT NOT NULL, id INTEGER NOT NULL, tf INTEGER NOT NULL,
+                PRIMARY KEY (term, id)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS terms (term TEXT PRIMARY KEY, df INTEGER NOT NULL) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS docs (id INTEGER PRIMARY KEY, length INTEGER NOT NULL);
+            CREATE TABLE IF NOT EXISTS stats (key TEXT PRIMARY KEY, value REAL NOT NULL);
+        """)
+        conns[str(path)] = conn
+    return conn
+
+
+def add_documents(rows, path=lexical_index_file):
+    with _write_lock:
+        conn = _connect(path)
+        with conn:
+            new_rows = []
+            for row in rows:
+                idx = int(row["id"])
+                if conn.execute("SELECT 1 FROM docs WHERE id = ?", (idx,)).fetchone():
+                    continue
+                new_rows.append((idx, tokenize(row["sentence"])))
+
+            if not new_rows:
+                return 0
+
+            conn.executemany(
+                "INSERT INTO docs (id, length) VALUES (?, ?)",
+                [(idx, len(tokens)) for idx, tokens in new_rows]
+            )
+
+            df = Counter()
+            postings = []
+            for idx, tokens in new_rows:
+                for term, tf in Counter(tokens).items():
+                    postings.append((term, idx, tf))
+                    df[term] += 1
+            conn.executemany("INSERT INTO postings (term, id, tf) VALUES (?, ?, ?)", postings)
+            conn.executemany(
+                "INSERT INTO terms (term, df) VALUES (?, ?) "
+                "ON CONFLICT(term) DO UPDATE SET df = df + excluded.df",
+                list(df.items())
+            )
+
+            total_len = sum(len(tokens) for _, tokens in new_rows)
+            conn.executemany(
+                "INSERT INTO stats (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = value + excluded.value",
+                [("n_docs", len(new_rows)), ("total_len", total_len)]
+            )
+        return len(new_rows)
+
+
+def search(query, top_k=20, accept=None, path=lexical_index_file):
+    # returns [(id, bm25_score)] best first; accept(id) can veto ids
+    conn = _connect(path)
+    stats = dict(conn.execute("SELECT key, value FROM stats").fetchall())
+    n_docs = stats.get("n_docs", 0)
+    if not n_docs:
+        return []
+    avg_len = stats["total_len"] / n_docs
+
+    query_tf = Counter(tokenize(query))
+    if not query_tf:
+        return []
+    marks = ",".join("?" * len(query_tf))
+    weights = []
+    for term, df in conn.execute(f"SELECT term, df FROM terms WHERE term IN ({marks})", list(query_tf)):
+        idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+        weights += [term, query_tf[term] * idf]
+    if not weights:
+        return []
+
+    # BM25 summed and ranked inside SQLite; the query terms join the
+    # postings primary key and only the top rows come back to Python
+    values = ",".join(["(?, ?)"] * (len(weights) // 2))
+    sql = (
+        f"WITH q(term, weight) AS (VALUES {values}) "
+        "SELECT p.id, SUM(q.weight * p.tf * ? / (p.tf + ? + ? * d.length)) AS score "
+        "FROM q JOIN postings p ON p.term = q.term JOIN docs d ON d.id = p.id "
+        "GROUP BY p.id ORDER BY score DESC LIMIT ?"
+    )
+    params = weights + [K1 + 1, K1 * (1 - B), K1 * B / avg_len]
+
+    # vetoed ids are skipped by fetching deeper until top_k survive
+    limit = top_k if accept is None else top_k * 4
+    while True:
+        rows = conn.execute(sql, params + [limit]).fetchall()
+        results = [(idx, score) for idx, score in rows if accept is None or accept(idx)]
+        if len(results) >= top_k or len(rows) < limit:
+            return results[:top_k]
+        limit *= 4
+
+
+def build(src=metas_file, path=lexical_index_file):
+    batch = []
+    added = 0
+    with open(src, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            batch.append(json.loads(line))
+            if len(batch) >= BUILD_BATCH:
+                added += add_documents(batch, path)
+                batch = []
+                logger.info(f"Indexed {added} sentences")
+    if batch:
+        added += add_documents(batch, path)
+    return added
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    n = build()
+    print(f"Lexical index written to {lexical_index_file} ({n} new sentences)")
@@ -1,8 +1,8 @@
 import json
 import re
 from dataclasses import dataclass
-from llama_cpp import Llama
 from .config import llama_8B
+from .model_registry import get_model, inference_lock
 
 
 @dataclass
@@ -13,15 +13,6 @@ class Subclaim:
     source_claim: str
 
 
-llm = Llama(
-    model_path=llama_8B,
-    n_ctx=4096,
-    n_gpu_layers=35,
-    n_threads=8,
-    n_batch=512,
-    verbose=False
-)
-
 PROMPT_TEMPLATE = """You are a claim decomposition module.
 
 CORE PRINCIPLE: Only decompose if the claim contains multiple INDEPENDENT facts that can be verified separately. Each subclaim must be self-contained with complete context.
@@ -103,12 +94,14 @@ def validate_response(data):
 def llm_decomposer(claim: str):
     prompt = build_decomposer_prompt(claim)
 
-    output = llm(
-        prompt=prompt,
-        max_tokens=512,
-        temperature=0.0,
-        stop=["\n\n", "Example", "Note:", "Replace", "#", "(", "because"]
-    )
+    llm = get_model(llama_8B)
+    with inference_lock(llama_8B):
+        output = llm(
+            prompt=prompt,
+            max_tokens=512,
+            temperature=0.0,
+            stop=["\n\n", "Example", "Note:", "Replace", "#", "(", "because"]
+        )
 
     text = output["choices"][0]["text"].strip()
     #print("RAW LLM OUTPUT:\n", text)
@@ -1,4 +1,5 @@
 import json
+import threading
 from pathlib import Path
 from datetime import datetime
 
@@ -7,6 +8,9 @@ LOG_PATH = BASE_DIR / "peft" / "data" / "nli_train.jsonl"
 
 LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
 
+# subclaims verified in parallel log from several threads
+_lock = threading.Lock()
+
 def log_nli_pair(claim, evidence, probs, pred, category="pipeline_mined"):
     record = {
         "claim": claim,
@@ -16,5 +20,7 @@ def log_nli_pair(claim, evidence, probs, pred, category="pipeline_mined"):
         "category": category,
         "timestamp": datetime.utcnow().isoformat()
     }
-    with open(LOG_PATH, "a", encoding="utf8") as f:
-        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    line = json.dumps(record, ensure_ascii=False) + "\n"
+    with _lock:
+        with open(LOG_PATH, "a", encoding="utf8") as f:
+            f.write(line)
@@ -0,0 +1,150 @@
+import logging
+import threading
+from array import array
+
+import numpy as np
+import faiss
+
+logger = logging.getLogger(__name__)
+
+# Per-attribute posting lists (value -> ids) over the sentence metadata,
+# kept in step with id_to_meta. A filter is turned into an id bitmap that
+# FAISS applies inside the index walk through an IDSelectorBitmap.
+
+FILTER_FIELDS = ("source_type", "primary_category", "credibility", "doc_id", "file_type")
+RANGE_FILTERS = {"min_credibility": "credibility", "max_credibility": "credibility"}
+MAX_CACHED_SELECTORS = 64
+
+
+class MetaFilterIndex:
+    def __init__(self):
+        self.postings = {field: {} for field in FILTER_FIELDS}
+        self.max_id = -1
+        self.size = 0
+        self._selectors = {}
+        self._lock = threading.Lock()
+
+    def _post(self, field, value, ids):
+        ids = np.asarray(ids, dtype=np.int64)
+        if not len(ids):
+            return
+        postings = self.postings[field]
+        if value not in postings:
+            postings[value] = array("q")
+        postings[value].extend(ids.tolist())
+
+    def add(self, rows):
+        with self._lock:
+            for row in rows:
+                idx = int(row["id"])
+                for field in FILTER_FIELDS:
+                    if field in row:
+                        self._post(field, row[field], [idx])
+                self.max_id = max(self.max_id, idx)
+                self.size += 1
+            self._selectors.clear()
+
+    def add_store(self, store):
+        # dictionary-encoded columns give every posting list with one argsort
+        with self._lock:
+            ids = np.asarray(store.ids)
+            for field in FILTER_FIELDS:
+                if field not in store.columns:
+                    continue
+                codes = np.asarray(store.columns[field])
+                order = np.argsort(codes, kind="stable")
+                sorted_codes = codes[order]
+                bounds = np.flatnonzero(np.diff(sorted_codes)) + 1
+                for chunk in np.split(order, bounds):
+                    code = int(codes[chunk[0]])
+                    if code >= 0:
+                        self._post(field, store.dictionaries[field][code], ids[chunk])
+            if len(ids):
+                self.max_id = max(self.max_id, int(ids.max()))
+            self.size += len(ids)
+            self._selectors.clear()
+
+        self.add(store.tail.values())
+
+    def _field_ids(self, field, accept):
+        postings = self.postings[field]
+        chunks = [
+            np.frombuffer(ids, dtype=np.int64)
+            for value, ids in postings.items()
+            if len(ids) and accept(value)
+        ]
+        if not chunks:
+            return np.zeros(0, dtype=np.int64)
+        return np.concatenate(chunks)
+
+    def _mask(self, filters):
+        mask = np.ones(self.max_id + 1, dtype=bool)
+        for key, wanted in filters.items():
+            if key in RANGE_FILTERS:
+                field = RANGE_FILTERS[key]
+                if key.startswith("min_"):
+                    accept = lambda v, t=wanted: v is not None and v >= t
+                else:
+                    accept = lambda v, t=wanted: v is not None and v <= t
+            else:
+                field = key
+                values = set(wanted) if isinstance(wanted, (list, tuple, set)) else {wanted}
+                accept = lambda v, values=values: v in values
+
+            field_mask = np.zeros(self.max_id + 1, dtype=bool)
+            field_mask[self._field_ids(field, accept)] = True
+            mask &= field_mask
+        return mask
+
+    def selector(self, filters):
+        # returns (IDSelectorBitmap, matching id count)
+        key = filter_key(filters)
+        with self._lock:
+            cached = self._selectors.get(key)
+            if cached is not None:
+                return cached[0], cached[2]
+
+            mask = self._mask(filters)
+            count = int(mask.sum())
+            bitmap = np.packbits(mask, bitorder="little")
+            sel = faiss.IDSelectorBitmap(bitmap)
+
+            if len(self._selectors) >= MAX_CACHED_SELECTORS:
+                self._selectors.pop(next(iter(self._selectors)))
+            # the bitmap must outlive the selector that points into it
+            self._selectors[key] = (sel, bitmap, count)
+            return sel, count
+
+
+def validate_filters(filters):
+    if not isinstance(filters, dict):
+        raise ValueError("filters must be an object")
+    for key, value in filters.items():
+        if key in RANGE_FILTERS:
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ValueError(f"{key} must be a number")
+        elif key not in FILTER_FIELDS:
+            raise ValueError(f"Unsupported filter: {key}")
+        else:
+            # values end up in sets and cache keys, so they must be hashable
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            if not all(_is_scalar(v) for v in values):
+                raise ValueError(f"{key} must be a value or a list of values")
+
+
+def _is_scalar(value):
+    return value is None or isinstance(value, (str, int, float, bool))
+
+
+def _typed(value):
+    # 1, 1.0, True and "1" select different rows, so they must not share a key
+    return (type(value).__name__, value)
+
+
+def filter_key(filters):
+    if not filters:
+        return ()
+    return tuple(sorted(
+        (k, tuple(sorted(set(map(_typed, v)))) if isinstance(v, (list, tuple, set)) else _typed(v))
+        for k, v in filters.items()
+    ))
@@ -0,0 +1,233 @@
+import json
+import logging
+import shutil
+from array import array
+from pathlib import Path
+
+import numpy as np
+
+from .config import metas_file, meta_store_dir
+
+logger = logging.getLogger(__name__)
+
+# Binary, memory-mapped sentence store built once from metas.jsonl.
+#
+#   sentences.bin     utf-8 sentences back to back
+#   offsets.npy       int64 [rows + 1] byte offsets into sentences.bin
+#   ids.npy           int64 [rows] FAISS id of each row
+#   id_to_row.npy     int32 [max_id + 1] row of each id, -1 if absent
+#   position.npy      int32 [rows]
+#   col_<field>.npy   int32 [rows] code into dictionaries.json, -1 if absent
+#   manifest.json     field order, row count and how much of metas.jsonl
+#                     the store covers
+#
+# Every file is opened read-only with mmap, so any number of worker
+# processes share the same pages through the OS page cache.
+
+STORE_VERSION = 1
+NUMERIC_FIELDS = {"position"}
+MISSING = -1
+NO_POSITION = np.iinfo(np.int32).min
+
+
+class MetaStore:
+    def __init__(self, path):
+        self.path = Path(path)
+
+        with open(self.path / "manifest.json", "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        with open(self.path / "dictionaries.json", "r", encoding="utf-8") as f:
+            self.dictionaries = json.load(f)
+
+        if manifest.get("version") != STORE_VERSION:
+            raise ValueError(f"Unsupported meta store version: {manifest.get('version')}")
+
+        self.fields = manifest["fields"]
+        self.rows = manifest["rows"]
+        self.source_bytes = manifest["source_bytes"]
+
+        self.offsets = np.load(self.path / "offsets.npy", mmap_mode="r")
+        self.ids = np.load(self.path / "ids.npy", mmap_mode="r")
+        self.id_to_row = np.load(self.path / "id_to_row.npy", mmap_mode="r")
+        self.position = np.load(self.path / "position.npy", mmap_mode="r")
+        self.columns = {
+            field: np.load(self.path / f"col_{field}.npy", mmap_mode="r")
+            for field in self.dictionaries
+        }
+
+        if self.offsets[-1] > 0:
+            self.sentences = np.memmap(self.path / "sentences.bin", dtype=np.uint8, mode="r")
+        else:
+            self.sentences = np.zeros(0, dtype=np.uint8)
+
+        # rows appended to metas.jsonl after the store was built
+        self.tail = {}
+
+    def row_of(self, idx):
+        if 0 <= idx < len(self.id_to_row):
+            row = int(self.id_to_row[idx])
+            if row >= 0:
+                return row
+        return None
+
+    def row(self, row):
+        out = {}
+        for field in self.fields:
+            if field == "id":
+                out["id"] = int(self.ids[row])
+            elif field == "sentence":
+                start, end = self.offsets[row], self.offsets[row + 1]
+                out["sentence"] = self.sentences[start:end].tobytes().decode("utf-8")
+            elif field == "position":
+                value = int(self.position[row])
+                out["position"] = None if value == NO_POSITION else value
+            else:
+                code = int(self.columns[field][row])
+                if code != MISSING:
+                    out[field] = self.dictionaries[field][code]
+        return out
+
+    def get(self, idx, default=None):
+        idx = int(idx)
+        if idx in self.tail:
+            return self.tail[idx]
+        row = self.row_of(idx)
+        if row is None:
+            return default
+        return self.row(row)
+
+    def add(self, rows):
+        for row in rows:
+            self.tail[int(row["id"])] = row
+
+    def __getitem__(self, idx):
+        meta = self.get(idx)
+        if meta is None:
+            raise KeyError(idx)
+        return meta
+
+    def __contains__(self, idx):
+        return int(idx) in self.tail or self.row_of(int(idx)) is not None
+
+    def __len__(self):
+        return self.rows + len(self.tail)
+
+    def __bool__(self):
+        return len(self) > 0
+
+
+def exists(path=meta_store_dir):
+    return (Path(path) / "manifest.json").exists()
+
+
+def open_meta_store(path=meta_store_dir):
+    if not exists(path):
+        return None
+    return MetaStore(path)
+
+
+def convert_jsonl(src=metas_file, dest=meta_store_dir):
+    src = Path(src)
+    dest = Path(dest)
+    tmp = dest.with_name(dest.name + ".tmp")
+    if tmp.exists():
+        shutil.rmtree(tmp)
+    tmp.mkdir(parents=True)
+
+    fields = []
+    dictionaries = {}
+    value_codes = {}
+    codes = {}
+
+    offsets = array("q", [0])
+    ids = array("q")
+    positions = array("i")
+    max_id = -1
+    rows = 0
+
+    with open(src, "rb") as f, open(tmp / "sentences.bin", "wb") as out:
+        for line in f:
+            if not line.strip():
+                continue
+            obj = json.loads(line)
+
+            for field in obj:
+                if field not in fields:
+                    fields.append(field)
+                if field in ("id", "sentence") or field in NUMERIC_FIELDS:
+                    continue
+                if field not in codes:
+                    dictionaries[field] = []
+                    value_codes[field] = {}
+                    # rows seen before this field appeared do not carry it
+                    codes[field] = array("i", [MISSING] * rows)
+
+            encoded = obj.get("sentence", "").encode("utf-8")
+            out.write(encoded)
+            offsets.append(offsets[-1] + len(encoded))
+
+            idx = int(obj["id"])
+            ids.append(idx)
+            max_id = max(max_id, idx)
+
+            position = obj.get("position")
+            positions.append(NO_POSITION if position is None else int(position))
+
+            for field, column in codes.items():
+                if field not in obj:
+                    column.append(MISSING)
+                    continue
+                value = obj[field]
+                key = json.dumps(value)
+                code = value_codes[field].get(key)
+                if code is None:
+                    code = len(dictionaries[field])
+                    value_codes[field][key] = code
+                    dictionaries[field].append(value)
+                column.append(code)
+
+            rows += 1
+
+        source_bytes = f.tell()
+
+    ids_arr = np.frombuffer(ids, dtype=np.int64) if rows else np.zeros(0, dtype=np.int64)
+    id_to_row = np.full(max_id + 1, -1, dtype=np.int32)
+    id_to_row[ids_arr] = np.arange(rows, dtype=np.int32)
+
+    np.save(tmp / "offsets.npy", np.frombuffer(offsets, dtype=np.int64))
+    np.save(tmp / "ids.npy", ids_arr)
+    np.save(tmp / "id_to_row.npy", id_to_row)
+    np.save(tmp / "position.npy", np.array(positions, dtype=np.int32))
+    for field, column in codes.items():
+        np.save(tmp / f"col_{field}.npy", np.array(column, dtype=np.int32))
+
+    with open(tmp / "dictionaries.json", "w", encoding="utf-8") as f:
+        json.dump(dictionaries, f, ensure_ascii=False)
+
+    # manifest last: a store without one is never opened
+    with open(tmp / "manifest.json", "w", encoding="utf-8") as f:
+        json.dump({
+            "version": STORE_VERSION,
+            "fields": fields,
+            "rows": rows,
+            "source_bytes": source_bytes
+        }, f, indent=2)
+
+    if dest.exists():
+        old = dest.with_name(dest.name + ".old")
+        if old.exists():
+            shutil.rmtree(old)
+        dest.replace(old)
+        tmp.replace(dest)
+        shutil.rmtree(old)
+    else:
+        tmp.replace(dest)
+
+    logger.info(f"Converted {rows} rows from {src} into {dest}")
+    return rows
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    n = convert_jsonl()
+    print(f"Meta store written to {meta_store_dir} ({n} rows)")
@@ -0,0 +1,162 @@
+import logging
+import os
+import threading
+import time
+
+from .config import (
+    gte, ms_marco_6, ms_marco_12, roberta_large, small_nli, bart_large_mnli, llama_8B,
+    rerank_mode, stance_mode
+)
+from .inference_backends import backend_for, load_cross_encoder, load_sequence_classifier
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+# Every model is loaded on first use through get_model and then shared by
+# all modules in the process. Loaders import their libraries lazily so
+# importing a module never pulls in a model it does not use.
+
+_loaders = {}
+_models = {}
+_stats = {}
+_locks = {}
+# models and fast tokenizers are not safe to call from several threads at
+# once; callers hold inference_lock(name) around each call
+_inference_locks = {}
+_registry_lock = threading.Lock()
+
+# what a claim verification request touches in the configured modes
+PIPELINE_MODELS = [gte, ms_marco_6, roberta_large, llama_8B]
+if rerank_mode != "l6":
+    PIPELINE_MODELS.append(ms_marco_12)
+if stance_mode == "cascade":
+    PIPELINE_MODELS.append(small_nli)
+
+
+def _torch_device():
+    import torch
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def _sentence_transformer(name):
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(name)
+
+
+def _cross_encoder(name):
+    backend = backend_for(name)
+    if backend != "torch":
+        return load_cross_encoder(name, backend)
+
+    from sentence_transformers import CrossEncoder
+    return CrossEncoder(name, device=_torch_device())
+
+
+def _nli(name):
+    backend = backend_for(name)
+    if backend != "torch":
+        return load_sequence_classifier(name, backend)
+
+    import torch
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+    model = AutoModelForSequenceClassification.from_pretrained(name)
+    tokenizer = AutoTokenizer.from_pretrained(name)
+    model.to(torch.device(_torch_device()))
+    model.eval()
+    return model, tokenizer
+
+
+def _zero_shot(name):
+    from transformers import pipeline
+    return pipeline("zero-shot-classification", model=name, device=0)
+
+
+def _llama(path):
+    from llama_cpp import Llama
+    return Llama(
+        model_path=path,
+        n_ctx=4096,
+        n_gpu_layers=35,
+        n_threads=8,
+        n_batch=512,
+        verbose=False
+    )
+
+
+def register_model(name, loader):
+    with _registry_lock:
+        _loaders[name] = loader
+        _locks.setdefault(name, threading.Lock())
+        _inference_locks.setdefault(name, threading.Lock())
+
+
+def _rss():
+    if psutil is None:
+        return None
+    return psutil.Process(os.getpid()).memory_info().rss
+
+
+def get_model(name):
+    model = _models.get(name)
+    if model is not None:
+        return model
+
+    if name not in _loaders:
+        raise KeyError(f"No model registered under {name!r}")
+
+    with _locks[name]:
+        model = _models.get(name)
+        if model is not None:
+            return model
+
+        rss_before = _rss()
+        start = time.perf_counter()
+        model = _loaders[name]()
+        load_seconds = time.perf_counter() - start
+        rss_after = _rss()
+
+        _stats[name] = {
+            "load_seconds": load_seconds,
+            "rss_delta_bytes": None if rss_before is None else rss_after - rss_before
+        }
+        logger.info(f"Loaded {name} in {load_seconds:.2f}s")
+
+        _models[name] = model
+        return model
+
+
+def inference_lock(name):
+    return _inference_locks[name]
+
+
+def warmup(names=None):
+    if names is None:
+        names = PIPELINE_MODELS
+    for name in names:
+        get_model(name)
+    return model_stats()
+
+
+def is_loaded(name):
+    return name in _models
+
+
+def model_stats():
+    return {
+        name: {"loaded": name in _models, **_stats.get(name, {})}
+        for name in _loaders
+    }
+
+
+register_model(gte, lambda: _sentence_transformer(gte))
+register_model(ms_marco_6, lambda: _cross_encoder(ms_marco_6))
+register_model(ms_marco_12, lambda: _cross_encoder(ms_marco_12))
+register_model(roberta_large, lambda: _nli(roberta_large))
+register_model(small_nli, lambda: _nli(small_nli))
+register_model(bart_large_mnli, lambda: _zero_shot(bart_large_mnli))
+register_model(llama_8B, lambda: _llama(llama_8B))
@@ -0,0 +1,210 @@
+import argparse
+import atexit
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from .config import nli_cache_file, nli_cache_max_entries, nli_cache_write_batch
+from .embedding_cache import normalize_text
+from .inference_backends import backend_for
+
+logger = logging.getLogger(__name__)
+
+# Persistent cache of NLI probabilities per (model, backend, subclaim,
+# evidence); fp32 and int8 runs of one model never share entries.
+# Lookups read SQLite directly; new scores and last-used times are buffered
+# and written in batches. Once the table outgrows max_entries the least
+# recently used rows are deleted.
+
+KEY_BYTES = 16
+LABELS = ("support", "contradict", "neutral")
+
+
+def cache_key(model_name, subclaim, evidence):
+    h = hashlib.blake2b(digest_size=KEY_BYTES)
+    for part in (model_name, backend_for(model_name), subclaim, evidence):
+        h.update(normalize_text(part).encode("utf-8"))
+        h.update(b"\0")
+    return h.digest()
+
+
+class NLICache:
+    def __init__(self, path, max_entries=nli_cache_max_entries, write_batch=nli_cache_write_batch):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.write_batch = write_batch
+
+        self.hits = 0
+        self.misses = 0
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._touched = {}
+        self._entries = None
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS nli (
+                    key BLOB PRIMARY KEY,
+                    support REAL NOT NULL,
+                    contradict REAL NOT NULL,
+                    neutral REAL NOT NULL,
+                    last_used REAL NOT NULL
+                ) WITHOUT ROWID
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS nli_last_used ON nli (last_used)")
+            self._local.conn = conn
+        return conn
+
+    def get_many(self, keys):
+        # returns {key: probs} for the keys that are cached
+        found = {}
+        with self._lock:
+            for k in keys:
+                if k in self._pending:
+                    found[k] = self._pending[k]
+
+        rest = [k for k in set(keys) if k not in found]
+        conn = self._connect()
+        # stay well below SQLite's bound parameter limit
+        for start in range(0, len(rest), 500):
+            chunk = rest[start:start + 500]
+            rows = conn.execute(
+                f"SELECT key, support, contradict, neutral FROM nli "
+                f"WHERE key IN ({','.join('?' * len(chunk))})",
+                chunk
+            ).fetchall()
+            for key, *probs in rows:
+                found[bytes(key)] = dict(zip(LABELS, probs))
+
+        now = time.time()
+        with self._lock:
+            for k in found:
+                self._touched[k] = now
+            self.hits += sum(1 for k in keys if k in found)
+            self.misses += sum(1 for k in keys if k not in found)
+            due = len(self._pending) + len(self._touched) >= self.write_batch
+
+        if due:
+            self.flush()
+        return found
+
+    def put_many(self, items):
+        # items: {key: probs}
+        with self._lock:
+            self._pending.update(items)
+            due = len(self._pending) >= self.write_batch
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            touched, self._touched = self._touched, {}
+        if not pending and not touched:
+            return
+
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO nli (key, support, contradict, neutral, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(k, *(p[label] for label in LABELS), now) for k, p in pending.items()]
+            )
+            conn.executemany(
+                "UPDATE nli SET last_used = ? WHERE key = ?",
+                [(t, k) for k, t in touched.items() if k not in pending]
+            )
+
+        if self._entries is None:
+            self._entries = self.count()
+        else:
+            self._entries += len(pending)
+        if self.max_entries and self._entries > self.max_entries:
+            self.prune()
+
+    def count(self):
+        return self._connect().execute("SELECT COUNT(*) FROM nli").fetchone()[0]
+
+    def prune(self, max_entries=None):
+        if max_entries is None:
+            max_entries = self.max_entries
+        conn = self._connect()
+        with conn:
+            removed = conn.execute(
+                "DELETE FROM nli WHERE key IN ("
+                "SELECT key FROM nli ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (max_entries,)
+            ).rowcount
+        self._entries = self.count()
+        if removed:
+            logger.info(f"Pruned {removed} NLI cache entries")
+        return removed
+
+    def clear(self):
+        with self._lock:
+            self._pending.clear()
+            self._touched.clear()
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM nli")
+        conn.execute("VACUUM")
+        self._entries = 0
+
+    def stats(self):
+        total = self.hits + self.misses
+        conn = self._connect()
+        oldest, newest = conn.execute("SELECT MIN(last_used), MAX(last_used) FROM nli").fetchone()
+        return {
+            "path": str(self.path),
+            "entries": self.count(),
+            "max_entries": self.max_entries,
+            "file_bytes": self.path.stat().st_size if self.path.exists() else 0,
+            "oldest_use": oldest,
+            "newest_use": newest,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_nli_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = NLICache(nli_cache_file)
+            atexit.register(_cache.flush)
+        return _cache
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Inspect or prune the NLI score cache")
+    parser.add_argument("command", choices=["stats", "prune", "clear"])
+    parser.add_argument("--max-entries", type=int, default=None)
+    args = parser.parse_args()
+
+    cache = NLICache(nli_cache_file)
+    if args.command == "stats":
+        for k, v in cache.stats().items():
+            print(f"{k}: {v}")
+    elif args.command == "prune":
+        print(f"Removed {cache.prune(args.max_entries)} entries, {cache.count()} left")
+    else:
+        cache.clear()
+        print(f"Cleared {nli_cache_file}")
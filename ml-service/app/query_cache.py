@@ -0,0 +1,84 @@
+import logging
+from pathlib import Path
+
+import numpy as np
+
+from .embedding_cache import normalize_text
+from .utils.lru import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# In-memory LRU of query text -> embedding in front of the query encoder.
+# Decomposition repeats subclaims across related claims and the eval
+# harness re-runs the same claims for every ablation, so most queries are
+# seen more than once. Optionally saved to an .npz file on shutdown.
+
+
+class QueryEmbeddingCache:
+    def __init__(self, model_name, capacity):
+        self.model_name = model_name
+        self.cache = LRUCache(capacity)
+
+    def encode(self, texts, encode_fn):
+        # encode_fn only sees the distinct texts that are not cached
+        keys = [normalize_text(t) for t in texts]
+
+        found = {}
+        missing = {}
+        for k, t in zip(keys, texts):
+            if k in found or k in missing:
+                continue
+            vector = self.cache.get(k)
+            if vector is None:
+                missing[k] = t
+            else:
+                found[k] = vector
+
+        if missing:
+            encoded = np.asarray(encode_fn(list(missing.values())), dtype=np.float32)
+            for k, vector in zip(missing, encoded):
+                vector.setflags(write=False)
+                self.cache.put(k, vector)
+                found[k] = vector
+
+        return np.stack([found[k] for k in keys]).astype(np.float32, copy=False)
+
+    def save(self, path):
+        items = self.cache.items()
+        if not items:
+            return 0
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                model=np.array(self.model_name),
+                queries=np.array([k for k, _ in items]),
+                vectors=np.stack([v for _, v in items])
+            )
+        tmp.replace(path)
+        return len(items)
+
+    def load(self, path):
+        path = Path(path)
+        if not path.exists():
+            return 0
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if str(data["model"]) != self.model_name:
+                    logger.info(f"Ignoring query cache built for {data['model']}")
+                    return 0
+                queries, vectors = data["queries"], data["vectors"]
+        except Exception as e:
+            logger.warning(f"Could not load query cache {path}: {e}")
+            return 0
+
+        # saved least recently used first, so recency order is kept
+        for query, vector in zip(queries, vectors):
+            vector.setflags(write=False)
+            self.cache.put(str(query), vector)
+        return len(queries)
+
+    def stats(self):
+        return {"model": self.model_name, **self.cache.stats()}
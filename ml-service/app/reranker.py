@@ -1,24 +1,84 @@
+import hashlib
+import math
 import numpy as np
 import logging
-import torch
 
-from sentence_transformers import CrossEncoder
 from typing import List, Dict
 
 from .config import *
+from .batch_scheduler import dispatch
+from .embedding_cache import normalize_text
+from .inference_backends import backend_for
+from .model_registry import get_model, inference_lock
+from .utils.lru import LRUCache
 
-DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
-model = CrossEncoder(ms_marco_6, device=DEVICE)
+# (model, query, sentence) digest -> cross-encoder score
+score_cache = LRUCache(rerank_cache_size)
 
+RERANK_MODELS = {"l6": ms_marco_6, "l12": ms_marco_12}
 
-def reranker(query: str, sentences_meta: List[Dict], top_n = 20):
-    if not sentences_meta:
-        return []
-    pairs = [(query, s['sentence']) for s in sentences_meta]
-    scores = model.predict(pairs)
 
-    scores = np.asarray(scores)
+def _pair_key(model_name, query, sentence):
+    h = hashlib.blake2b(digest_size=16)
+    for part in (model_name, backend_for(model_name), query, sentence):
+        h.update(normalize_text(part).encode("utf-8"))
+        h.update(b"\0")
+    return h.digest()
+
+
+def predict_pairs(pairs, model_name=ms_marco_6, batch_size=None):
+    # scored in batches of similar length so each batch only pads to its
+    # own longest pair; scores come back in input order
+    if batch_size is None:
+        batch_size = rerank_batch_size
+
+    model = get_model(model_name)
+    order = sorted(range(len(pairs)), key=lambda i: len(pairs[i][0]) + len(pairs[i][1]))
+    scores = np.zeros(len(pairs), dtype=np.float32)
+    for start in range(0, len(order), batch_size):
+        batch = order[start:start + batch_size]
+        with inference_lock(model_name):
+            predicted = model.predict(
+                [pairs[i] for i in batch],
+                batch_size=len(batch),
+                show_progress_bar=False
+            )
+        scores[batch] = np.asarray(predicted).reshape(-1)
+    return scores
+
+
+def score_pairs(pairs, model_name=ms_marco_6, batch_size=None):
+    # cached pairs are skipped; the rest go to the cross-encoder, through
+    # the cross-request batcher when the server runs one
+    if not pairs:
+        return np.zeros(0, dtype=np.float32)
+
+    keys = [_pair_key(model_name, q, s) for q, s in pairs]
+    scores = {}
+    missing = {}
+    for key, pair in zip(keys, pairs):
+        if key in scores or key in missing:
+            continue
+        score = score_cache.get(key)
+        if score is None:
+            missing[key] = pair
+        else:
+            scores[key] = score
 
+    if missing:
+        predicted = dispatch(
+            model_name,
+            list(missing.values()),
+            lambda p: predict_pairs(p, model_name, batch_size)
+        )
+        for key, score in zip(missing, predicted):
+            scores[key] = float(score)
+            score_cache.put(key, float(score))
+
+    return np.array([scores[k] for k in keys], dtype=np.float32)
+
+
+def _rank(sentences_meta, scores, top_n):
     for sentence, score in zip(sentences_meta, scores):
         sentence['rerank_score'] = float(score)
 
@@ -27,4 +87,92 @@ def reranker(query: str, sentences_meta: List[Dict], top_n = 20):
     for rank, sentence in enumerate(sentences_meta):
         sentence['rerank_rank'] = rank+1
 
-    return sentences_meta[:top_n]
\ No newline at end of file
+    return sentences_meta[:top_n]
+
+
+def _stage_two_count(ranked, top_n, fraction, margin):
+    n = len(ranked)
+    k = min(n, max(top_n, math.ceil(fraction * n)))
+    if k == 0:
+        return 0
+    floor = ranked[k - 1]['rerank_score'] - margin
+    while k < n and ranked[k]['rerank_score'] >= floor:
+        k += 1
+    return k
+
+
+def _cascade(queries, sentences_meta_lists, scores, top_n):
+    # scores are L6 scores for every candidate; the head of each L6 ranking
+    # is re-scored by L12 and ranked above the rest
+    ranked_lists = []
+    heads = []
+    start = 0
+    for sentences_meta in sentences_meta_lists:
+        end = start + len(sentences_meta)
+        ranked = _rank(sentences_meta, scores[start:end], len(sentences_meta))
+        ranked_lists.append(ranked)
+        heads.append(_stage_two_count(ranked, top_n, cascade_fraction, cascade_margin))
+        start = end
+
+    pairs = [
+        (query, s['sentence'])
+        for query, ranked, k in zip(queries, ranked_lists, heads)
+        for s in ranked[:k]
+    ]
+    l12_scores = score_pairs(pairs, ms_marco_12)
+
+    results = []
+    start = 0
+    for ranked, k in zip(ranked_lists, heads):
+        head, tail = ranked[:k], ranked[k:]
+        for s in head:
+            s['rerank_score_l6'] = s['rerank_score']
+        head = _rank(head, l12_scores[start:start + k], k)
+        start += k
+
+        merged = head + tail
+        for rank, s in enumerate(merged):
+            s['rerank_rank'] = rank+1
+        results.append(merged[:top_n])
+
+    return results
+
+
+def _check_mode(mode):
+    if mode is None:
+        mode = rerank_mode
+    if mode != "cascade" and mode not in RERANK_MODELS:
+        raise ValueError(f"Unknown rerank mode: {mode}")
+    return mode
+
+
+def reranker(query: str, sentences_meta: List[Dict], top_n = 20, mode = None):
+    if not sentences_meta:
+        return []
+    return reranker_many([query], [sentences_meta], top_n=top_n, mode=mode)[0]
+
+
+def reranker_many(queries: List[str], sentences_meta_lists: List[List[Dict]], top_n = 20, mode = None):
+    # one scoring pass over the candidates of every query
+    mode = _check_mode(mode)
+    pairs = [
+        (query, s['sentence'])
+        for query, sentences_meta in zip(queries, sentences_meta_lists)
+        for s in sentences_meta
+    ]
+    if not pairs:
+        return [[] for _ in queries]
+
+    if mode == "cascade":
+        return _cascade(queries, sentences_meta_lists, score_pairs(pairs, ms_marco_6), top_n)
+
+    scores = score_pairs(pairs, RERANK_MODELS[mode])
+
+    results = []
+    start = 0
+    for sentences_meta in sentences_meta_lists:
+        end = start + len(sentences_meta)
+        results.append(_rank(sentences_meta, scores[start:end], top_n))
+        start = end
+
+    return results
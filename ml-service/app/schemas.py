@@ -39,6 +39,8 @@ class ErrorResponse(BaseModel):
             return 400
         elif self.error_type == "processing":
             return 422
+        elif self.error_type == "overloaded":
+            return 429
         elif self.error_type == "system":
             return 500
         else:
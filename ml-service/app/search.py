@@ -1,41 +1,182 @@
+import atexit
 import json
 import logging
+import threading
+import time
 
 import numpy as np
-from sentence_transformers import SentenceTransformer
 from sklearn.preprocessing import normalize
 
 from .reranker import reranker
-from .build_index import get_faiss_index
-from .config import gte, metas_file, topk
+from .batch_scheduler import Overloaded, dispatch
+from .build_index import get_faiss_index, get_index_generation, search_params
+from .config import (
+    gte, metas_file, topk, meta_check_interval, hybrid_search, rrf_k,
+    query_cache_size, query_cache_persist, query_cache_file,
+    result_cache_size, result_cache_max_bytes
+)
+from . import lexical_index
+from .meta_store import MetaStore, open_meta_store
+from .embedding_cache import normalize_text
+from .meta_filters import MetaFilterIndex, validate_filters, filter_key
+from .model_registry import get_model, inference_lock
+from .query_cache import QueryEmbeddingCache
+from .utils.lru import LRUCache
+from .search_tiers import tier_value
 from .schemas import ErrorResponse
 
 logger = logging.getLogger(__name__)
-model = SentenceTransformer(gte)
 
 id_to_meta = {}
+# bytes of metas.jsonl already reflected in id_to_meta
+_meta_offset = 0
+_meta_lock = threading.RLock()
+_meta_checker = None
+# posting lists for filtered search, built on first use
+_filter_index = None
+# bumped whenever id_to_meta changes; part of the result cache key together
+# with the index generation
+_meta_generation = 0
+
+# filtered HNSW/IVF walks skip non-matching ids, so the search budget is
+# widened by the inverse selectivity of the filter up to this cap
+FILTER_MAX_SEARCH_VALUE = 1024
+
+query_cache = QueryEmbeddingCache(gte, query_cache_size)
+if query_cache_persist:
+    query_cache.load(query_cache_file)
+    atexit.register(query_cache.save, query_cache_file)
+
+def _result_bytes(rows):
+    return sum(200 + len(r.get("sentence") or "") for r in rows)
+
+result_cache = LRUCache(result_cache_size, max_bytes=result_cache_max_bytes, sizeof=_result_bytes)
+
+def _read_meta_rows(start=0):
+    # only whole lines are consumed, a row still being written by another
+    # process is picked up by the next read
+    with open(str(metas_file), 'rb') as f:
+        f.seek(start)
+        data = f.read()
+
+    cut = data.rfind(b"\n") + 1
+    rows = [json.loads(line) for line in data[:cut].splitlines() if line.strip()]
+    return rows, start + cut
 
 def load_id_to_meta(force_reload: bool = False):
-    global id_to_meta
-    if id_to_meta and not force_reload:
-        return
-    id_to_meta = {}
-    with open(str(metas_file), 'r', encoding='utf8') as f:
-        for line in f:
-            obj = json.loads(line)
+    global id_to_meta, _meta_offset, _filter_index, _meta_generation
+    with _meta_lock:
+        if id_to_meta and not force_reload:
+            return
+
+        _filter_index = None
+        _meta_generation += 1
+
+        store = open_meta_store()
+        if store is not None:
+            size = metas_file.stat().st_size if metas_file.exists() else 0
+            if size >= store.source_bytes:
+                rows, _meta_offset = _read_meta_rows(store.source_bytes)
+                store.add(rows)
+                id_to_meta = store
+                return
+            logger.warning("Meta store is newer than metas.jsonl, falling back to JSONL")
+
+        rows, end = _read_meta_rows()
+        meta = {}
+        for obj in rows:
+            meta[obj['id']] = obj
+        id_to_meta = meta
+        _meta_offset = end
+
+def _add_rows(rows):
+    global _meta_generation
+    _meta_generation += 1
+    if hasattr(id_to_meta, "add"):
+        id_to_meta.add(rows)
+    else:
+        for obj in rows:
             id_to_meta[obj['id']] = obj
+    if _filter_index is not None:
+        _filter_index.add(rows)
 
-def search(subclaim: str, top_k: int = None):
-    index = get_faiss_index()
-    if not id_to_meta:
-        load_id_to_meta()
+def get_filter_index():
+    global _filter_index
+    with _meta_lock:
+        if _filter_index is None:
+            if not id_to_meta:
+                load_id_to_meta()
+            filter_index = MetaFilterIndex()
+            if isinstance(id_to_meta, MetaStore):
+                filter_index.add_store(id_to_meta)
+            else:
+                filter_index.add(id_to_meta.values())
+            _filter_index = filter_index
+        return _filter_index
+
+def append_id_to_meta(rows, start=None, end=None):
+    # rows were just appended to metas.jsonl at byte range [start, end)
+    global _meta_offset
+    with _meta_lock:
+        if not id_to_meta:
+            load_id_to_meta()
+            return
+
+        _add_rows(rows)
+        # if another writer got in between, leave the offset alone and let
+        # the consistency check read the gap (re-adding ours is harmless)
+        if start is not None and start == _meta_offset:
+            _meta_offset = end
+
+def check_id_to_meta():
+    global _meta_offset
+    with _meta_lock:
+        if not id_to_meta:
+            return 0
+
+        size = metas_file.stat().st_size if metas_file.exists() else 0
+        if size == _meta_offset:
+            return 0
 
+        if size < _meta_offset:
+            logger.warning("metas.jsonl shrank, reloading metadata")
+            load_id_to_meta(force_reload=True)
+            return len(id_to_meta)
+
+        rows, _meta_offset = _read_meta_rows(_meta_offset)
+        _add_rows(rows)
+        if rows:
+            logger.info(f"Metadata consistency check picked up {len(rows)} rows")
+        return len(rows)
+
+def _consistency_loop(interval):
+    while True:
+        time.sleep(interval)
+        try:
+            check_id_to_meta()
+        except Exception as e:
+            logger.error(f"Metadata consistency check failed: {e}")
+
+def start_meta_consistency_check(interval=None):
+    global _meta_checker
+    with _meta_lock:
+        if _meta_checker is not None:
+            return
+        if interval is None:
+            interval = meta_check_interval
+        _meta_checker = threading.Thread(
+            target=_consistency_loop, args=(interval,), daemon=True
+        )
+        _meta_checker.start()
+
+def _validate_query(subclaim):
     if not subclaim or not subclaim.strip():
         raise ErrorResponse(
             message="NO QUERY FOUND!!, QUERY IS REQUIRED",
             error_type="validation"
         ).to_http_exception()
 
+def _validate_top_k(top_k):
     if top_k is None:
         top_k = topk
 
@@ -53,32 +194,191 @@ def search(subclaim: str, top_k: int = None):
             error_type="validation"
         ).to_http_exception()
 
+    return top_k
+
+def _validate_tier(tier):
+    try:
+        return tier_value(tier)
+    except KeyError:
+        raise ErrorResponse(
+            message=f"Unknown search tier: {tier}",
+            error_type="validation"
+        ).to_http_exception()
+
+def _hydrate(ids, scores):
+    results = []
+
+    for rank, (idx, score) in enumerate(zip(ids, scores), start=1):
+        if idx == -1:
+            continue
+        meta = id_to_meta.get(int(idx))
+        if meta is None:
+            meta = {"sentence": "Not found", "doc_id": None, "position": None}
+        faiss_rank = rank
+        results.append({
+            "id": int(idx),
+            "faiss_score": float(score),
+            "faiss_rank": faiss_rank,
+            **meta
+        })
+
+    return results
+
+def _validate_filters(filters):
+    try:
+        validate_filters(filters)
+    except ValueError as e:
+        raise ErrorResponse(
+            message=str(e),
+            error_type="validation"
+        ).to_http_exception()
+
+def validate_search_options(tier=None, filters=None):
+    # for callers that want bad options rejected before they start any work
+    _validate_tier(tier)
+    if filters:
+        _validate_filters(filters)
+
+def _filter_selector(filters, search_value):
+    filter_index = get_filter_index()
+    sel, count = filter_index.selector(filters)
+    if count:
+        selectivity = count / max(1, filter_index.size)
+        search_value = min(
+            max(search_value, int(search_value / selectivity)),
+            max(search_value, FILTER_MAX_SEARCH_VALUE)
+        )
+    return sel, count, search_value
+
+def _fuse(dense, lexical, top_k):
+    # reciprocal rank fusion of the FAISS and BM25 rankings
+    fused = {}
+    for r in dense:
+        fused[r["id"]] = r
+        r["rrf_score"] = 1.0 / (rrf_k + r["faiss_rank"])
+
+    for rank, (idx, score) in enumerate(lexical, start=1):
+        r = fused.get(idx)
+        if r is None:
+            meta = id_to_meta.get(idx)
+            if meta is None:
+                continue
+            r = fused[idx] = {
+                "id": idx,
+                "faiss_score": 0.0,
+                "faiss_rank": None,
+                **meta,
+                "rrf_score": 0.0
+            }
+        r["bm25_score"] = float(score)
+        r["bm25_rank"] = rank
+        r["rrf_score"] += 1.0 / (rrf_k + rank)
+
+    results = sorted(fused.values(), key=lambda r: r["rrf_score"], reverse=True)
+    return results[:top_k]
+
+def _lexical(subclaim, top_k, sel):
     try:
-        query_embeddings = model.encode(
-            [subclaim],
+        accept = (lambda idx: sel.is_member(idx)) if sel is not None else None
+        return lexical_index.search(subclaim, top_k=top_k, accept=accept)
+    except Exception as e:
+        logger.warning(f"Lexical search failed, using dense results only: {e}")
+        return []
+
+def encode_queries(texts):
+    model = get_model(gte)
+    with inference_lock(gte):
+        return model.encode(
+            texts,
             convert_to_numpy=True,
             normalize_embeddings=True
         )
 
-        D, I = index.search(query_embeddings, top_k)
-        results = []
+def _encode_queries(subclaims):
+    # cache misses go through the cross-request batcher when the server runs one
+    return query_cache.encode(
+        subclaims,
+        lambda texts: np.asarray(dispatch(gte, texts, encode_queries))
+    )
 
-        for rank, (idx, score) in enumerate(zip(I[0], D[0]), start=1):
-            if idx == -1:
-                continue
-            meta = id_to_meta.get(int(idx))
-            if meta is None:
-                meta = {"sentence": "Not found", "doc_id": None, "position": None}
-            faiss_rank = rank
-            results.append({
-                "id": int(idx),
-                "faiss_score": float(score),
-                "faiss_rank": faiss_rank,
-                **meta
-            })
+def cache_stats():
+    return {
+        "query_embeddings": query_cache.stats(),
+        "results": result_cache.stats()
+    }
+
+def search(subclaim: str, top_k: int = None, tier: str = None, filters: dict = None,
+           hybrid: bool = None):
+    return search_many([subclaim], top_k=top_k, tier=tier, filters=filters, hybrid=hybrid)[0]
+
+def search_many(subclaims, top_k: int = None, tier: str = None, filters: dict = None,
+                hybrid: bool = None):
+    index = get_faiss_index()
+    if not id_to_meta:
+        load_id_to_meta()
+
+    if not subclaims:
+        return []
+
+    for subclaim in subclaims:
+        _validate_query(subclaim)
+
+    top_k = _validate_top_k(top_k)
+    search_value = _validate_tier(tier)
+    if filters:
+        _validate_filters(filters)
+
+    if hybrid is None:
+        hybrid = hybrid_search
+    hybrid = hybrid and lexical_index.available()
+
+    # read before searching: results racing an update are filed under the
+    # old generation and never served afterwards
+    generation = (get_index_generation(), _meta_generation)
+    keys = [
+        (normalize_text(s), top_k, search_value, filter_key(filters), hybrid, generation)
+        for s in subclaims
+    ]
+    results = [result_cache.get(key) for key in keys]
+
+    missing = [i for i, rows in enumerate(results) if rows is None]
+    if missing:
+        fresh = _search_uncached(
+            index, [subclaims[i] for i in missing], top_k, search_value, filters, hybrid
+        )
+        for i, rows in zip(missing, fresh):
+            result_cache.put(keys[i], rows)
+            results[i] = rows
+
+    # callers annotate the result dicts (rerank scores, stances)
+    return [[dict(r) for r in rows] for rows in results]
+
+def _search_uncached(index, subclaims, top_k, search_value, filters, hybrid):
+    sel = None
+    if filters:
+        sel, count, search_value = _filter_selector(filters, search_value)
+        if count == 0:
+            return [[] for _ in subclaims]
+
+    params = search_params(index, search_value, sel=sel)
+
+    try:
+        query_embeddings = _encode_queries(list(subclaims))
+
+        D, I = index.search(query_embeddings, top_k, params=params)
+
+        results = [_hydrate(I[row], D[row]) for row in range(len(subclaims))]
+
+        if hybrid:
+            results = [
+                _fuse(dense, _lexical(subclaim, top_k, sel), top_k)
+                for subclaim, dense in zip(subclaims, results)
+            ]
 
         return results
 
+    except Overloaded:
+        raise
     except Exception as e:
         logger.error(f"Search query failed: {e}")
         raise ErrorResponse(
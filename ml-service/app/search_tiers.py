@@ -0,0 +1,134 @@
+import json
+import logging
+import time
+from pathlib import Path
+
+import faiss
+import numpy as np
+
+from .build_index import get_faiss_index, base_index, search_params
+from .config import gte, search_tiers, default_search_tier, search_tiers_file
+from .model_registry import get_model, inference_lock
+
+logger = logging.getLogger(__name__)
+
+EVAL_FILE = Path(__file__).resolve().parent / "claim_pipeline_eval" / "claims_eval.json"
+
+# minimum recall@k against exact search for each tier
+TIER_TARGETS = {"interactive": 0.90, "balanced": 0.95, "exhaustive": 0.99}
+CANDIDATES = [8, 16, 24, 32, 48, 64, 96, 128, 192, 256, 384, 512, 768, 1024]
+
+_tiers = None
+
+
+def load_tiers():
+    global _tiers
+    tiers = dict(search_tiers)
+    if Path(search_tiers_file).exists():
+        with open(search_tiers_file, "r", encoding="utf-8") as f:
+            calibrated = json.load(f)
+        tiers.update({name: t["value"] for name, t in calibrated["tiers"].items()})
+    _tiers = tiers
+    return tiers
+
+
+def tier_value(tier=None):
+    tiers = _tiers if _tiers is not None else load_tiers()
+    if tier is None:
+        tier = default_search_tier
+    if tier not in tiers:
+        raise KeyError(tier)
+    return tiers[tier]
+
+
+def _exact_neighbours(index, xq, top_k, block_rows=65536):
+    # brute-force inner product over the vectors stored in the index
+    # (decoded for quantized kinds), a block at a time
+    base = base_index(index)
+    if isinstance(index, faiss.IndexIDMap):
+        ids = faiss.vector_to_array(index.id_map)
+    else:
+        ids = np.arange(index.ntotal, dtype=np.int64)
+
+    # IVF lists can only be reconstructed by position through a direct map
+    direct_map = hasattr(base, "make_direct_map")
+    if direct_map:
+        base.make_direct_map()
+    try:
+        heap = faiss.ResultHeap(len(xq), top_k, keep_max=True)
+        for start in range(0, base.ntotal, block_rows):
+            block = base.reconstruct_n(start, min(block_rows, base.ntotal - start))
+            flat = faiss.IndexFlatIP(block.shape[1])
+            flat.add(block)
+            # a block smaller than top_k pads with id -1
+            D, I = flat.search(xq, top_k)
+            heap.add_result(D, np.where(I >= 0, ids[start + np.maximum(I, 0)], -1))
+        heap.finalize()
+        return heap.I
+    finally:
+        if direct_map:
+            base.make_direct_map(False)
+
+
+def _recall(found, truth):
+    hits = 0
+    total = 0
+    for f, t in zip(found, truth):
+        t = set(t[t != -1])
+        hits += len(set(f[f != -1]) & t)
+        total += len(t)
+    return hits / total if total else 1.0
+
+
+def calibrate(queries, top_k=20, targets=None, save=True):
+    if targets is None:
+        targets = TIER_TARGETS
+
+    index = get_faiss_index()
+    model = get_model(gte)
+    with inference_lock(gte):
+        xq = model.encode(queries, convert_to_numpy=True, normalize_embeddings=True)
+
+    truth = _exact_neighbours(index, np.ascontiguousarray(xq, dtype=np.float32), top_k)
+
+    measured = []
+    for value in CANDIDATES:
+        params = search_params(index, value)
+        start = time.perf_counter()
+        _, found = index.search(xq, top_k, params=params)
+        per_query_ms = 1000 * (time.perf_counter() - start) / len(queries)
+        measured.append({"value": value, "recall": _recall(found, truth), "ms_per_query": per_query_ms})
+        logger.info(f"value={value} recall@{top_k}={measured[-1]['recall']:.4f} {per_query_ms:.3f}ms/query")
+
+    tiers = {}
+    for name, target in targets.items():
+        chosen = next((m for m in measured if m["recall"] >= target), measured[-1])
+        tiers[name] = {"target_recall": target, **chosen}
+
+    result = {"top_k": top_k, "num_queries": len(queries), "tiers": tiers, "sweep": measured}
+
+    if save:
+        Path(search_tiers_file).parent.mkdir(parents=True, exist_ok=True)
+        with open(search_tiers_file, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        load_tiers()
+
+    return result
+
+
+def load_eval_queries(path=EVAL_FILE):
+    with open(path, "r", encoding="utf-8") as f:
+        claims = json.load(f)
+
+    queries = []
+    for item in claims:
+        queries.append(item["claim"])
+        queries.extend(sc["text"] for sc in item.get("expected_subclaims", []))
+    return queries
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    result = calibrate(load_eval_queries())
+    for name, t in result["tiers"].items():
+        print(f"{name:12s} value={t['value']:5d} recall={t['recall']:.4f} {t['ms_per_query']:.3f}ms/query")
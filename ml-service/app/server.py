@@ -0,0 +1,232 @@
+import asyncio
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from fastapi import FastAPI, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+
+from . import reranker, search as search_module, stance_classifier
+from .batch_scheduler import Overloaded, register_batcher, scheduler_stats, stop_all
+from .claim_pipeline import check_mode, claim_wrapper, claim_wrapper_stream, STREAM_SUBCLAIM_MODE
+from .config import (
+    gte, ms_marco_6, ms_marco_12, roberta_large, small_nli,
+    rerank_mode, stance_mode, server_workers, server_max_pending,
+    batch_max_size, batch_max_wait_ms, batch_max_queue
+)
+from .model_registry import model_stats, warmup, PIPELINE_MODELS
+from .schemas import ErrorResponse, SearchResponse, SearchResult
+
+logger = logging.getLogger(__name__)
+
+# Async HTTP front end for claim verification and search. The pipeline is
+# synchronous, so every request runs on a bounded thread pool; requests
+# beyond server_max_pending are turned away with 429 instead of queueing
+# without limit. Model calls from concurrent requests meet in the
+# per-model micro-batchers of app.batch_scheduler. A request holds its slot
+# until the worker is done with it, even if the client has gone away.
+#
+#   uvicorn app.server:app --host 0.0.0.0 --port 8000
+
+_executor = ThreadPoolExecutor(max_workers=server_workers, thread_name_prefix="request")
+_pending = 0
+_pending_lock = threading.Lock()
+
+
+class VerifyRequest(BaseModel):
+    claim: str
+    mode: Optional[str] = None
+    tier: Optional[str] = None
+    filters: Optional[dict] = None
+
+
+class SearchRequest(BaseModel):
+    query: str
+    top_k: Optional[int] = None
+    tier: Optional[str] = None
+    filters: Optional[dict] = None
+    hybrid: Optional[bool] = None
+
+
+def _batched_models():
+    models = [gte, ms_marco_6, roberta_large]
+    if rerank_mode != "l6":
+        models.append(ms_marco_12)
+    if stance_mode == "cascade":
+        models.append(small_nli)
+    return models
+
+
+def _start_batchers():
+    options = dict(
+        max_batch=batch_max_size,
+        max_wait=batch_max_wait_ms / 1000,
+        max_queue=batch_max_queue
+    )
+    # only the models the configured rerank_mode and stance_mode call
+    for name in _batched_models():
+        if name == gte:
+            fn = search_module.encode_queries
+        elif name in (ms_marco_6, ms_marco_12):
+            fn = lambda p, name=name: reranker.predict_pairs(p, name)
+        else:
+            fn = lambda p, name=name: stance_classifier.predict_pairs(p, model_name=name)
+        register_batcher(name, fn, **options)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # load everything before the first request instead of inside it
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(_executor, warmup, PIPELINE_MODELS)
+    await loop.run_in_executor(_executor, search_module.load_id_to_meta)
+    _start_batchers()
+    search_module.start_meta_consistency_check()
+    logger.info("Claim service ready")
+    yield
+    stop_all()
+    _executor.shutdown(wait=False)
+
+
+app = FastAPI(title="Fact-Anchor claim service", lifespan=lifespan)
+
+
+@app.exception_handler(Overloaded)
+async def overloaded_handler(request: Request, exc: Overloaded):
+    return _overloaded()
+
+
+def _overloaded():
+    error = ErrorResponse(message="Server is overloaded, retry later", error_type="overloaded")
+    return JSONResponse(status_code=error.status_code, content=error.dict())
+
+
+def _take_slot():
+    global _pending
+    with _pending_lock:
+        if _pending >= server_max_pending:
+            return False
+        _pending += 1
+        return True
+
+
+def _release_slot(*_):
+    global _pending
+    with _pending_lock:
+        _pending -= 1
+
+
+async def _run(fn, *args, **kwargs):
+    if not _take_slot():
+        return None
+    future = _executor.submit(fn, *args, **kwargs)
+    # released when the call finishes or is cancelled before it starts,
+    # not when the awaiting request is cancelled
+    future.add_done_callback(_release_slot)
+    return await asyncio.wrap_future(future)
+
+
+def _validate(request):
+    # only bad input is a 400; a ValueError from inside the pipeline is a 500
+    if not request.claim or not request.claim.strip():
+        ErrorResponse(message="claim is required", error_type="validation").to_http_exception()
+    try:
+        check_mode(request.mode)
+    except ValueError as e:
+        ErrorResponse(message=str(e), error_type="validation").to_http_exception()
+    search_module.validate_search_options(request.tier, request.filters)
+
+
+def _to_search_result(row):
+    return SearchResult(
+        sentence=row.get("sentence") or "",
+        file_name=row.get("doc_id") or "",
+        position=row["position"] if row.get("position") is not None else -1,
+        score=row.get("rrf_score", row.get("faiss_score", 0.0))
+    )
+
+
+@app.post("/verify")
+async def verify(request: VerifyRequest):
+    _validate(request)
+    result = await _run(
+        claim_wrapper, request.claim,
+        mode=request.mode, tier=request.tier, filters=request.filters
+    )
+    if result is None:
+        return _overloaded()
+    return jsonable_encoder(result)
+
+
+@app.post("/verify/stream")
+async def verify_stream(request: VerifyRequest):
+    # NDJSON: one event per line, see claim_pipeline.claim_wrapper_stream
+    # once streaming starts the status is 200, so bad options must fail here
+    _validate(request)
+    events = claim_wrapper_stream(
+        request.claim, mode=request.mode or STREAM_SUBCLAIM_MODE,
+        tier=request.tier, filters=request.filters
+    )
+    if not _take_slot():
+        return _overloaded()
+
+    def finish(*_):
+        # runs once no worker is inside the generator
+        try:
+            events.close()
+        finally:
+            _release_slot()
+
+    async def body():
+        step = None
+        try:
+            while True:
+                step = _executor.submit(next, events, None)
+                event = await asyncio.wrap_future(step)
+                if event is None:
+                    break
+                yield json.dumps(jsonable_encoder(event), ensure_ascii=False) + "\n"
+        except Exception as e:
+            # the status line is already sent, so errors become an event
+            if isinstance(e, Overloaded):
+                error = ErrorResponse(message="Server is overloaded, retry later", error_type="overloaded")
+            else:
+                logger.error(f"Streaming verification failed: {e}")
+                error = ErrorResponse(message=getattr(e, "detail", None) or str(e), error_type="system")
+            yield json.dumps({"event": "error", **error.dict()}) + "\n"
+        finally:
+            # after a disconnect the last step may still be running; the
+            # slot is released only once it is done
+            if step is None:
+                finish()
+            else:
+                step.add_done_callback(finish)
+
+    return StreamingResponse(body(), media_type="application/x-ndjson")
+
+
+@app.post("/search", response_model=SearchResponse)
+async def search(request: SearchRequest):
+    rows = await _run(
+        search_module.search, request.query,
+        top_k=request.top_k, tier=request.tier, filters=request.filters, hybrid=request.hybrid
+    )
+    if rows is None:
+        return _overloaded()
+    return SearchResponse(results=[_to_search_result(r) for r in rows])
+
+
+@app.get("/health")
+async def health():
+    return {
+        "status": "ok",
+        "pending_requests": _pending,
+        "models": model_stats(),
+        "batchers": scheduler_stats(),
+        "caches": search_module.cache_stats()
+    }
@@ -1,5 +1,10 @@
 from .config import *
 
+def evidence_weight(e):
+    # unified ranking / weighting signal
+    rank_score = e.get('rerank_score', e['faiss_score'])
+    return max(0.0, rank_score)
+
 def aggregate_evidences(stance_results):
     seen_sentences = set()
     supporting = []
@@ -20,9 +25,7 @@ def aggregate_evidences(stance_results):
 
         stance_score = s - c
 
-        # unified ranking / weighting signal
-        rank_score = e.get('rerank_score', e['faiss_score'])
-        weight = max(0.0, rank_score)
+        weight = evidence_weight(e)
 
         evidence_contribution = weight * stance_score
         e['stance_score'] = stance_score
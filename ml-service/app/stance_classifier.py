@@ -1,9 +1,15 @@
+import threading
+
 import torch
 import torch.nn.functional as F
 
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-
-from .config import roberta_large, support_threshold, contradict_threshold, delta
+from .config import (
+    roberta_large, small_nli, support_threshold, contradict_threshold, delta,
+    nli_batch_size, nli_cache, stance_mode, nli_escalation_band
+)
+from .batch_scheduler import dispatch
+from .model_registry import get_model, inference_lock
+from .nli_cache import cache_key, get_nli_cache
 
 label_mapping = {
     "entailment": "support",
@@ -11,31 +17,120 @@ label_mapping = {
     "neutral": "neutral"
 }
 
-model = AutoModelForSequenceClassification.from_pretrained(roberta_large)
-tokenizer = AutoTokenizer.from_pretrained(roberta_large)
+def _to_labels(probs, id2label):
+    scores = {
+        id2label[i].lower(): probs[i].item()
+        for i in range(len(probs))
+    }
+    return {label_mapping[k]: v for k, v in scores.items()}
 
-device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-model.to(device)
-model.eval()
+# pairs scored in cascade mode and how many of them reached roberta-large
+cascade_stats = {"pairs": 0, "escalated": 0}
+_stats_lock = threading.Lock()
 
-def stance_score(subclaim, evidence):
-    inputs = tokenizer(evidence, subclaim, truncation=True,
-                       padding=True, return_tensors="pt").to(device)
+def needs_escalation(probs, band=None):
+    # confident when plainly neutral (both below the band) or when support
+    # or contradict is above it
+    low, high = band or nli_escalation_band
+    s, c = probs["support"], probs["contradict"]
+    if s > high or c > high:
+        return False
+    return s >= low or c >= low
 
-    with torch.no_grad():
-        outputs = model(**inputs)
-        logits = outputs.logits
-        probs = F.softmax(logits, dim=-1).squeeze(0)
+def stance_score_batch(pairs, batch_size=None, use_cache=None, mode=None):
+    # pairs are (subclaim, evidence); the evidence is the NLI premise
+    if not pairs:
+        return []
 
-    id2label = model.config.id2label
+    if mode is None:
+        mode = stance_mode
+    if mode == "single":
+        return _cached_scores(roberta_large, pairs, batch_size, use_cache)
+    if mode != "cascade":
+        raise ValueError(f"Unknown stance mode: {mode}")
 
-    scores = {
-        id2label[i].lower(): probs[i].item()
-        for i in range(len(probs))
-    }
-    labels= {label_mapping[k]: v for k, v in scores.items()}
+    results = _cached_scores(small_nli, pairs, batch_size, use_cache)
+    escalate = [i for i, probs in enumerate(results) if needs_escalation(probs)]
+    if escalate:
+        rescored = _cached_scores(
+            roberta_large, [pairs[i] for i in escalate], batch_size, use_cache
+        )
+        for i, probs in zip(escalate, rescored):
+            results[i] = probs
+
+    with _stats_lock:
+        cascade_stats["pairs"] += len(pairs)
+        cascade_stats["escalated"] += len(escalate)
+    return results
+
+def _cached_scores(model_name, pairs, batch_size=None, use_cache=None):
+    if not pairs:
+        return []
+
+    if use_cache is None:
+        use_cache = nli_cache
+    if not use_cache:
+        return _dispatch(model_name, pairs, batch_size)
 
-    return labels
+    cache = get_nli_cache()
+    keys = [cache_key(model_name, subclaim, evidence) for subclaim, evidence in pairs]
+    found = cache.get_many(keys)
+
+    missing = {}
+    for key, pair in zip(keys, pairs):
+        if key not in found and key not in missing:
+            missing[key] = pair
+
+    if missing:
+        scored = _dispatch(model_name, list(missing.values()), batch_size)
+        fresh = dict(zip(missing, scored))
+        cache.put_many(fresh)
+        found.update(fresh)
+
+    return [dict(found[key]) for key in keys]
+
+def _dispatch(model_name, pairs, batch_size=None):
+    # through the cross-request batcher when the server runs one
+    return dispatch(model_name, pairs, lambda p: predict_pairs(p, batch_size, model_name))
+
+def predict_pairs(pairs, batch_size=None, model_name=roberta_large):
+    if batch_size is None:
+        batch_size = nli_batch_size
+
+    model, tokenizer = get_model(model_name)
+    lock = inference_lock(model_name)
+
+    subclaims = [p[0] for p in pairs]
+    evidences = [p[1] for p in pairs]
+
+    # sort by tokenized length so each batch only pads to its own longest pair
+    with lock:
+        encoded = tokenizer(evidences, subclaims, truncation=True)["input_ids"]
+    lengths = [len(ids) for ids in encoded]
+    order = sorted(range(len(pairs)), key=lambda i: lengths[i])
+
+    results = [None] * len(pairs)
+    for start in range(0, len(order), batch_size):
+        bucket = order[start:start + batch_size]
+        with lock, torch.no_grad():
+            inputs = tokenizer(
+                [evidences[i] for i in bucket],
+                [subclaims[i] for i in bucket],
+                truncation=True,
+                padding=True,
+                return_tensors="pt"
+            ).to(model.device)
+
+            logits = model(**inputs).logits
+            probs = F.softmax(logits, dim=-1)
+
+        for i, row in zip(bucket, probs):
+            results[i] = _to_labels(row, model.config.id2label)
+
+    return results
+
+def stance_score(subclaim, evidence):
+    return stance_score_batch([(subclaim, evidence)])[0]
 
 """
 def choose_stance(labels):
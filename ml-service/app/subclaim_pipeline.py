@@ -1,31 +1,30 @@
-from .search import search
-from .reranker import reranker
-from .stance_classifier import stance_score
-from .stance_aggregator import aggregate_evidences
+import logging
+
+from .search import search, search_many
+from .reranker import reranker, reranker_many
+from .stance_classifier import stance_score_batch
+from .stance_aggregator import aggregate_evidences, evidence_weight
 from .subclaim_verdict import get_verdict, get_controversy
 from app.logging.nli_logger import log_nli_pair
 
+logger = logging.getLogger(__name__)
+
 USE_RERANKER = True
 USE_NLI = True
 
-def run_subclaim_pipeline(subclaim, top_k=20, top_n=10):
-    subclaim = subclaim.text
-    retrieved = search(subclaim, top_k=top_k)
+# run NLI only on evidence that can add to a strength: the first occurrence
+# of each sentence with a positive weight. The rest (rerank score <= 0, or a
+# repeat the aggregator drops) cannot move the strengths, so verdict,
+# controversy flag, strengths and the claim verdict built on them match full
+# evaluation; such sentences are just not listed as evidence. Applies to the
+# sequential and batched subclaim modes alike.
+EARLY_STOP = False
 
-    # Reranker ablation switch
-    if USE_RERANKER:
-        reranked = reranker(subclaim, retrieved, top_n=top_n)
-    else:
-        reranked = retrieved
+NEUTRAL_PROBS = {"support": 0.0, "contradict": 0.0, "neutral": 1.0}
 
+def _attach_stances(subclaim, reranked, all_probs):
     stance_results = []
-    for e in reranked:
-        if USE_NLI:
-            probs = stance_score(subclaim, e["sentence"])
-        else:
-            # NLI ablation: neutral-only baseline
-            probs = {"support": 0.0, "contradict": 0.0, "neutral": 1.0}
-
+    for e, probs in zip(reranked, all_probs):
         e["probs"] = probs
 
         pred = max(probs, key=probs.get)
@@ -39,6 +38,9 @@ def run_subclaim_pipeline(subclaim, top_k=20, top_n=10):
 
         stance_results.append(e)
 
+    return stance_results
+
+def _build_result(subclaim, stance_results):
     aggregated = aggregate_evidences(stance_results)
 
     verdict, total, support, contradict = get_verdict(aggregated)
@@ -58,4 +60,91 @@ def run_subclaim_pipeline(subclaim, top_k=20, top_n=10):
             "contradicting": aggregated["contradicting"],
             "neutral": aggregated["neutral"]
         }
-    }
\ No newline at end of file
+    }
+
+def _weighted(evidences):
+    # the aggregator counts only the first occurrence of a sentence
+    seen = set()
+    weighted = []
+    for e in evidences:
+        sent = e["sentence"].strip()
+        if sent in seen:
+            continue
+        seen.add(sent)
+        if evidence_weight(e) > 0:
+            weighted.append(e)
+    return weighted
+
+def _score_weighted(texts, reranked):
+    scoring = [_weighted(rr) for rr in reranked]
+    pairs = [(text, e["sentence"]) for text, evs in zip(texts, scoring) for e in evs]
+    all_probs = stance_score_batch(pairs)
+
+    results = []
+    start = 0
+    for text, rr, evs in zip(texts, reranked, scoring):
+        end = start + len(evs)
+        stance_results = _attach_stances(text, evs, all_probs[start:end])
+        results.append(_build_result(text, stance_results))
+        start = end
+        logger.info(f"Early stop: {len(evs)}/{len(rr)} NLI calls, {len(rr) - len(evs)} saved for {text!r}")
+
+    return results
+
+def run_subclaim_pipeline(subclaim, top_k=20, top_n=10, tier=None, filters=None, early_stop=None):
+    subclaim = subclaim.text
+    retrieved = search(subclaim, top_k=top_k, tier=tier, filters=filters)
+
+    # Reranker ablation switch
+    if USE_RERANKER:
+        reranked = reranker(subclaim, retrieved, top_n=top_n)
+    else:
+        reranked = retrieved
+
+    if early_stop is None:
+        early_stop = EARLY_STOP
+
+    if USE_NLI and early_stop:
+        return _score_weighted([subclaim], [reranked])[0]
+
+    if USE_NLI:
+        all_probs = stance_score_batch([(subclaim, e["sentence"]) for e in reranked])
+    else:
+        # NLI ablation: neutral-only baseline
+        all_probs = [dict(NEUTRAL_PROBS) for _ in reranked]
+
+    stance_results = _attach_stances(subclaim, reranked, all_probs)
+    return _build_result(subclaim, stance_results)
+
+def run_subclaim_pipeline_batch(subclaims, top_k=20, top_n=10, tier=None, filters=None, early_stop=None):
+    # retrieval for every subclaim first, then the reranker and NLI model each
+    # see all (subclaim, evidence) pairs of the claim as a single workload
+    texts = [sc.text for sc in subclaims]
+    retrieved = search_many(texts, top_k=top_k, tier=tier, filters=filters)
+
+    if USE_RERANKER:
+        reranked = reranker_many(texts, retrieved, top_n=top_n)
+    else:
+        reranked = retrieved
+
+    if early_stop is None:
+        early_stop = EARLY_STOP
+
+    if USE_NLI and early_stop:
+        return _score_weighted(texts, reranked)
+
+    pairs = [(text, e["sentence"]) for text, rr in zip(texts, reranked) for e in rr]
+    if USE_NLI:
+        all_probs = stance_score_batch(pairs)
+    else:
+        all_probs = [dict(NEUTRAL_PROBS) for _ in pairs]
+
+    results = []
+    start = 0
+    for text, rr in zip(texts, reranked):
+        end = start + len(rr)
+        stance_results = _attach_stances(text, rr, all_probs[start:end])
+        results.append(_build_result(text, stance_results))
+        start = end
+
+    return results
@@ -39,4 +39,43 @@ def get_controversy(aggregator_output, verdict):
     if support_ratio > 0.25 and contradict_ratio > 0.25:
         return True
 
-    return False
\ No newline at end of file
+    return False
+
+def _outcome(support, contradict):
+    agg = {
+        "total_strength": support + contradict,
+        "support_strength": support,
+        "contradict_strength": contradict
+    }
+    verdict = get_verdict(agg)[0]
+    return verdict, get_controversy(agg, verdict)
+
+def verdict_is_decided(support, contradict, remaining_weight):
+    # Each unscored evidence adds at most its weight to exactly one of the
+    # two strengths, so the final strengths lie in
+    #   {(support + a, contradict + b) : a, b >= 0, a + b <= remaining_weight}
+    # Over that region the verdict only depends on the support ratio, which
+    # is smallest at (support, contradict + R) and largest at
+    # (support + R, contradict), and the controversy flag is true on one
+    # interval of the ratio around 0.5.
+    if remaining_weight <= 0:
+        return True
+
+    # slack so float rounding in the final sums cannot leave the region
+    R = remaining_weight * (1 + 1e-9) + 1e-12
+    total = support + contradict
+
+    if total < 0.2 <= total + R:
+        # still INCONCLUSIVE for lack of strength, but may not stay so
+        return False
+    if total <= 0:
+        # no strength yet, a ratio of 0.5 is as reachable as nothing at all
+        return False
+
+    corners = [(support, contradict + R), (support + R, contradict)]
+    if abs(support - contradict) <= R:
+        m = max(support, contradict)
+        corners.append((m, m))
+
+    outcomes = {_outcome(s, c) for s, c in corners}
+    return len(outcomes) == 1 and _outcome(support, contradict) in outcomes
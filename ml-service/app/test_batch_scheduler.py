@@ -0,0 +1,78 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.batch_scheduler import MicroBatcher, Overloaded, dispatch, register_batcher, stop_all
+
+def test_concurrent_requests_are_coalesced_in_order():
+    calls = []
+    def square(items):
+        calls.append(len(items))
+        return [x * x for x in items]
+
+    batcher = MicroBatcher("square", square, max_batch=64, max_wait=0.05)
+    try:
+        with ThreadPoolExecutor(8) as pool:
+            futures = [pool.submit(lambda i=i: batcher.submit([i, i + 1]).result()) for i in range(8)]
+            results = [f.result() for f in futures]
+    finally:
+        batcher.stop()
+
+    assert results == [[i * i, (i + 1) * (i + 1)] for i in range(8)]
+    assert len(calls) < 8
+    assert sum(calls) == 16
+
+def test_batches_respect_max_batch():
+    sizes = []
+    release = threading.Event()
+    def record(items):
+        release.wait(1)
+        sizes.append(len(items))
+        return items
+
+    batcher = MicroBatcher("record", record, max_batch=4, max_wait=0.01)
+    try:
+        futures = [batcher.submit([i, i]) for i in range(6)]
+        release.set()
+        assert [f.result() for f in futures] == [[i, i] for i in range(6)]
+    finally:
+        batcher.stop()
+
+    assert max(sizes) <= 4
+
+def test_full_queue_raises_overloaded():
+    release = threading.Event()
+    batcher = MicroBatcher("slow", lambda items: release.wait(1) and items, max_batch=1, max_queue=2)
+    try:
+        first = batcher.submit([1])
+        time.sleep(0.05)  # let the worker take it
+        batcher.submit([2, 3])
+        with pytest.raises(Overloaded):
+            batcher.submit([4])
+        release.set()
+        assert first.result() == [1]
+    finally:
+        release.set()
+        batcher.stop()
+
+def test_errors_reach_every_caller():
+    def fail(items):
+        raise RuntimeError("boom")
+
+    batcher = MicroBatcher("fail", fail, max_wait=0.01)
+    try:
+        with pytest.raises(RuntimeError):
+            batcher.submit([1]).result()
+    finally:
+        batcher.stop()
+
+def test_dispatch_falls_back_without_batcher():
+    assert dispatch("unregistered", [1, 2], lambda items: [x + 1 for x in items]) == [2, 3]
+
+    register_batcher("double", lambda items: [x * 2 for x in items], max_wait=0.001)
+    try:
+        assert dispatch("double", [1, 2], lambda items: None) == [2, 4]
+    finally:
+        stop_all()
@@ -0,0 +1,91 @@
+import json
+
+import numpy as np
+import pytest
+
+pytest.importorskip("sklearn")
+
+from app import build_index
+from app.index_wal import IndexWAL
+
+D = 16
+CHUNK = 10
+
+def vector(text):
+    rng = np.random.default_rng(int(text.split()[-1]))
+    v = rng.standard_normal(D).astype("float32")
+    return v / np.linalg.norm(v)
+
+def write_metas(path, n, word="sentence"):
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(n):
+            f.write(json.dumps({"id": i, "sentence": f"{word} {i}"}) + "\n")
+
+class Encoder:
+    # stands in for gte; fail_after makes the n+1-th call raise
+    def __init__(self, fail_after=None):
+        self.rows = 0
+        self.calls = 0
+        self.fail_after = fail_after
+
+    def __call__(self, texts, show_progress_bar=False):
+        if self.fail_after is not None and self.calls >= self.fail_after:
+            raise KeyboardInterrupt
+        self.calls += 1
+        self.rows += len(texts)
+        return np.stack([vector(t) for t in texts])
+
+@pytest.fixture
+def build(tmp_path, monkeypatch):
+    monkeypatch.setattr(build_index, "metas_file", tmp_path / "metas.jsonl")
+    monkeypatch.setattr(build_index, "index_build_dir", tmp_path / "build")
+    monkeypatch.setattr(build_index, "faiss_index", tmp_path / "index.faiss")
+    monkeypatch.setattr(build_index, "wal", IndexWAL(tmp_path / "index.faiss.wal"))
+    monkeypatch.setattr(build_index, "build_chunk_size", CHUNK)
+    monkeypatch.setattr(build_index, "index", None)
+
+    def run(encoder):
+        monkeypatch.setattr(build_index, "_encode", encoder)
+        build_index.initialize_faiss_index()
+        return build_index.index
+
+    return run
+
+def test_interrupted_build_resumes_at_first_unfinished_shard(build, tmp_path):
+    write_metas(tmp_path / "metas.jsonl", 45)
+
+    with pytest.raises(KeyboardInterrupt):
+        build(Encoder(fail_after=2))
+
+    encoder = Encoder()
+    index = build(encoder)
+    assert encoder.rows == 45 - 2 * CHUNK
+    assert index.ntotal == 45
+    _, ids = index.search(vector("sentence 33")[None, :], 1)
+    assert ids[0][0] == 33
+    assert not (tmp_path / "build").exists()
+
+def test_rewritten_metadata_discards_progress(build, tmp_path):
+    write_metas(tmp_path / "metas.jsonl", 45)
+    with pytest.raises(KeyboardInterrupt):
+        build(Encoder(fail_after=2))
+
+    # same length, different sentences
+    write_metas(tmp_path / "metas.jsonl", 45, word="sentenxe")
+    encoder = Encoder()
+    index = build(encoder)
+    assert encoder.rows == 45
+    assert index.ntotal == 45
+
+@pytest.mark.parametrize("kind", list(build_index.INDEX_FACTORY))
+def test_every_index_type_builds(build, tmp_path, monkeypatch, kind):
+    monkeypatch.setattr(build_index, "index_type", kind)
+    monkeypatch.setattr(build_index, "pq_m", 4)
+    monkeypatch.setattr(build_index, "pq_nbits", 4)
+    # trains partway through, then adds the remaining shards directly
+    monkeypatch.setattr(build_index, "index_train_size", 260)
+    write_metas(tmp_path / "metas.jsonl", 400)
+
+    index = build(Encoder())
+    assert index.is_trained
+    assert index.ntotal == 400
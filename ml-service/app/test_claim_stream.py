@@ -0,0 +1,87 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("sklearn")
+
+from app import claim_pipeline
+from app.claim_pipeline import SUBCLAIM_MODES, claim_wrapper, claim_wrapper_stream
+
+CLAIM = "Vaccines are safe, cheap and reduce hospitalisation."
+SUBCLAIMS = {
+    "Vaccines are safe.": ("SUPPORT", 0.9, 0.0),
+    "Vaccines are cheap.": ("CONTRADICT", 0.1, 0.8),
+    "Vaccines reduce hospitalisation.": ("INCONCLUSIVE", 0.1, 0.0),
+}
+TEXTS = list(SUBCLAIMS)
+
+def result(text):
+    verdict, support, contradict = SUBCLAIMS[text]
+    return {
+        "subclaim": text,
+        "verdict": verdict,
+        "controversial": False,
+        "strengths": {"support": support, "contradict": contradict, "total": support + contradict},
+        "evidence": {"supporting": [], "contradicting": [], "neutral": []}
+    }
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = []
+
+    def run(sc, tier=None, filters=None):
+        calls.append(sc.text)
+        # later subclaims finish first, so parallel mode reports out of order
+        time.sleep(0.02 * (len(TEXTS) - TEXTS.index(sc.text)))
+        return result(sc.text)
+
+    monkeypatch.setattr(
+        claim_pipeline, "decompose_claim", lambda claim: [SimpleNamespace(text=t) for t in TEXTS]
+    )
+    monkeypatch.setattr(claim_pipeline, "run_subclaim_pipeline", run)
+    monkeypatch.setattr(
+        claim_pipeline, "run_subclaim_pipeline_batch", lambda subclaims, **kwargs: [run(sc) for sc in subclaims]
+    )
+    return calls
+
+@pytest.mark.parametrize("mode", SUBCLAIM_MODES)
+def test_events_arrive_in_order(calls, mode):
+    events = list(claim_wrapper_stream(CLAIM, mode=mode))
+
+    assert events[0] == {"event": "decomposition", "claim": CLAIM, "subclaims": TEXTS}
+    assert events[-1]["event"] == "final"
+
+    middle = events[1:-1]
+    assert [e["event"] for e in middle] == ["subclaim"] * len(TEXTS)
+    assert sorted(e["index"] for e in middle) == list(range(len(TEXTS)))
+    for e in middle:
+        assert e["result"]["subclaim"] == TEXTS[e["index"]]
+
+@pytest.mark.parametrize("mode", SUBCLAIM_MODES)
+def test_final_event_matches_claim_wrapper(calls, mode):
+    final = list(claim_wrapper_stream(CLAIM, mode=mode))[-1]["result"]
+
+    assert final == claim_wrapper(CLAIM, mode=mode)
+    assert final == claim_wrapper(CLAIM, mode="sequential")
+    assert [s["subclaim"] for s in final["subclaims"]] == TEXTS
+
+def test_unknown_mode_fails_before_streaming(calls):
+    with pytest.raises(ValueError):
+        claim_wrapper_stream(CLAIM, mode="eventually")
+    assert calls == []
+
+def test_stopping_early_cancels_queued_subclaims(calls, monkeypatch):
+    executor = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(claim_pipeline, "_executor", executor)
+
+    events = claim_wrapper_stream(CLAIM, mode="parallel")
+    assert next(events)["event"] == "decomposition"
+    assert next(events)["event"] == "subclaim"
+    events.close()
+    executor.shutdown(wait=True)
+
+    # the first subclaim finished and at most one more had started
+    assert len(calls) < len(TEXTS)
@@ -0,0 +1,62 @@
+import numpy as np
+
+from app.embedding_cache import EmbeddingCache, KEY_BYTES
+
+D = 8
+
+class Encoder:
+    def __init__(self):
+        self.seen = []
+
+    def __call__(self, texts):
+        self.seen.extend(texts)
+        return np.stack([np.full(D, len(t), dtype="float32") for t in texts])
+
+def test_hits_and_misses_are_counted(tmp_path):
+    cache = EmbeddingCache(tmp_path, "model")
+    encoder = Encoder()
+
+    cache.encode(["a", "bb", "a"], encoder)
+    assert encoder.seen == ["a", "bb"]
+    assert (cache.hits, cache.misses) == (1, 2)
+
+    out = cache.encode(["bb", "ccc"], encoder)
+    assert encoder.seen == ["a", "bb", "ccc"]
+    assert (cache.hits, cache.misses) == (2, 3)
+    assert out[:, 0].tolist() == [2.0, 3.0]
+
+def test_cached_rows_are_not_reencoded_by_a_new_instance(tmp_path):
+    EmbeddingCache(tmp_path, "model").encode(["one", "two  words"], Encoder())
+
+    encoder = Encoder()
+    out = EmbeddingCache(tmp_path, "model").encode(["two words", "one"], encoder)
+    assert encoder.seen == []
+    # normalized text shares the row encoded from "two  words"
+    assert out[:, 0].tolist() == [10.0, 3.0]
+
+def test_torn_tail_is_cut_off_before_appending(tmp_path):
+    cache = EmbeddingCache(tmp_path, "model")
+    cache.encode(["a", "bb"], Encoder())
+
+    # a crash left half a vector row and half a key behind
+    with open(cache._vectors_path(0), "ab") as f:
+        f.write(b"\x01" * 5)
+    with open(cache._keys_path(0), "ab") as f:
+        f.write(b"\x02" * (KEY_BYTES // 2))
+
+    restarted = EmbeddingCache(tmp_path, "model")
+    out = restarted.encode(["ccc", "a"], Encoder())
+    assert out[:, 0].tolist() == [3.0, 1.0]
+
+    row_bytes = D * restarted.dtype.itemsize
+    assert cache._vectors_path(0).stat().st_size == 3 * row_bytes
+    assert cache._keys_path(0).stat().st_size == 3 * KEY_BYTES
+    assert EmbeddingCache(tmp_path, "model").encode(["bb"], Encoder())[0, 0] == 2.0
+
+def test_dtypes_do_not_share_vector_files(tmp_path):
+    EmbeddingCache(tmp_path, "model", dtype="float16").encode(["a", "bb"], Encoder())
+
+    encoder = Encoder()
+    out = EmbeddingCache(tmp_path, "model", dtype="float32").encode(["bb"], encoder)
+    assert encoder.seen == ["bb"]
+    assert out[0, 0] == 2.0
@@ -0,0 +1,40 @@
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+
+from app.id_allocator import IdAllocator
+
+def _reserve_blocks(path, sizes):
+    allocator = IdAllocator(path)
+    return [(allocator.reserve(n), n) for n in sizes]
+
+def _assert_disjoint(blocks, total):
+    ids = [start + i for start, n in blocks for i in range(n)]
+    assert len(ids) == len(set(ids)) == total
+
+def test_blocks_are_contiguous_and_persisted(tmp_path):
+    path = tmp_path / "next_id.txt"
+    allocator = IdAllocator(path)
+
+    assert allocator.reserve(5) == 0
+    assert allocator.reserve(1) == 5
+    # a fresh allocator (e.g. after a restart) continues after the last block
+    assert IdAllocator(path).reserve(10) == 6
+    assert path.read_text() == "16"
+
+def test_threads_never_share_ids(tmp_path):
+    path = tmp_path / "next_id.txt"
+    sizes = [3, 1, 7, 2] * 25
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        chunks = list(pool.map(lambda s: _reserve_blocks(path, [s]), sizes))
+
+    _assert_disjoint([b for chunk in chunks for b in chunk], sum(sizes))
+
+def test_processes_never_share_ids(tmp_path):
+    path = tmp_path / "next_id.txt"
+    sizes = [4, 9, 1, 16] * 5
+
+    with multiprocessing.get_context("spawn").Pool(4) as pool:
+        chunks = pool.starmap(_reserve_blocks, [(path, sizes)] * 4)
+
+    _assert_disjoint([b for chunk in chunks for b in chunk], 4 * sum(sizes))
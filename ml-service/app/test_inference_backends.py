@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("onnxruntime")
+torch = pytest.importorskip("torch")
+transformers = pytest.importorskip("transformers")
+
+from app.config import ms_marco_6, roberta_large
+from app.inference_backends import OnnxCrossEncoder, OnnxSequenceClassifier
+
+# (query / subclaim, sentence / evidence)
+PAIRS = [
+    ("Vaccines reduce hospitalisation.", "The vaccine cut hospital admissions by 80 percent in the trial."),
+    ("Vaccines reduce hospitalisation.", "Hospital admissions were unchanged among vaccinated patients."),
+    ("The Eiffel Tower is in Berlin.", "The Eiffel Tower is a wrought-iron lattice tower in Paris, France."),
+    ("Solar power is getting cheaper.", "The cost of solar modules fell by roughly 90 percent over the last decade."),
+    ("Coffee causes dehydration.", "Moderate coffee intake does not lead to dehydration in habitual drinkers."),
+    ("GPT-4 was released in 2023.", "OpenAI released GPT-4 in March 2023."),
+]
+
+# max mean |probability delta| against the PyTorch model
+TOLERANCE = {"onnx": 1e-3, "onnx-int8": 0.05}
+
+def softmax(x):
+    e = np.exp(x - x.max(axis=-1, keepdims=True))
+    return e / e.sum(axis=-1, keepdims=True)
+
+def sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+def torch_logits(name, first, second):
+    tokenizer = transformers.AutoTokenizer.from_pretrained(name)
+    model = transformers.AutoModelForSequenceClassification.from_pretrained(name)
+    model.eval()
+    inputs = tokenizer(first, second, truncation=True, padding=True, return_tensors="pt")
+    with torch.no_grad():
+        return model(**inputs).logits.numpy()
+
+@pytest.fixture(scope="module")
+def onnx_root(tmp_path_factory):
+    return tmp_path_factory.mktemp("onnx")
+
+@pytest.mark.parametrize("backend", ["onnx", "onnx-int8"])
+def test_cross_encoder_parity(onnx_root, backend):
+    queries = [p[0] for p in PAIRS]
+    sentences = [p[1] for p in PAIRS]
+    expected = sigmoid(torch_logits(ms_marco_6, queries, sentences).reshape(-1))
+
+    model = OnnxCrossEncoder(ms_marco_6, backend, root=onnx_root)
+    inputs = model.tokenizer(queries, sentences, truncation=True, padding=True, return_tensors="np")
+    got = sigmoid(model.logits(inputs).reshape(-1))
+
+    assert model.predict(PAIRS).shape == (len(PAIRS),)
+    assert np.abs(got - expected).mean() <= TOLERANCE[backend]
+    assert np.argmax(got) == np.argmax(expected)
+
+@pytest.mark.parametrize("backend", ["onnx", "onnx-int8"])
+def test_nli_parity(onnx_root, backend):
+    evidences = [p[1] for p in PAIRS]
+    subclaims = [p[0] for p in PAIRS]
+    expected = softmax(torch_logits(roberta_large, evidences, subclaims))
+
+    model = OnnxSequenceClassifier(roberta_large, backend, root=onnx_root)
+    inputs = model.tokenizer(evidences, subclaims, truncation=True, padding=True, return_tensors="np")
+    got = softmax(model.logits(inputs))
+
+    assert np.abs(got - expected).mean() <= TOLERANCE[backend]
+    assert (got.argmax(axis=1) == expected.argmax(axis=1)).mean() >= 5 / 6
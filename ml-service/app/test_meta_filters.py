@@ -0,0 +1,32 @@
+import pytest
+
+from app.meta_filters import MetaFilterIndex, filter_key, validate_filters
+
+def test_scalar_and_list_values_are_accepted():
+    validate_filters({"source_type": "paper", "doc_id": [1, 2], "min_credibility": 0.5})
+
+@pytest.mark.parametrize("value", [[["paper"]], {"a": 1}, [{"a": 1}]])
+def test_nested_values_are_rejected(value):
+    with pytest.raises(ValueError):
+        validate_filters({"source_type": value})
+
+def test_unknown_filter_is_rejected():
+    with pytest.raises(ValueError):
+        validate_filters({"colour": "red"})
+
+def test_selector_matches_filtered_ids():
+    index = MetaFilterIndex()
+    index.add([
+        {"id": 0, "source_type": "paper", "credibility": 0.9},
+        {"id": 1, "source_type": "news", "credibility": 0.4},
+        {"id": 2, "source_type": "paper", "credibility": 0.2},
+    ])
+    filters = {"source_type": ["paper"], "min_credibility": 0.5}
+    _, count = index.selector(filters)
+    assert count == 1
+    assert filter_key(filters) == filter_key({"min_credibility": 0.5, "source_type": ("paper",)})
+
+def test_key_tells_value_types_apart():
+    assert filter_key({"doc_id": [1]}) != filter_key({"doc_id": ["1"]})
+    assert filter_key({"doc_id": 1}) != filter_key({"doc_id": True})
+    assert filter_key({"doc_id": [2, 1, 1]}) == filter_key({"doc_id": (1, 2)})
@@ -0,0 +1,53 @@
+import json
+
+from app.meta_store import MetaStore, convert_jsonl
+
+ROWS = [
+    {"id": 0, "doc_id": "a.txt", "file_type": "txt", "position": 0,
+     "sentence": "Transformers rely entirely on self-attention.", "source_type": "local",
+     "credibility": 0.8999999999999999, "source_url": None, "primary_category": None},
+    {"id": 1, "doc_id": "a.txt", "file_type": "txt", "position": 1,
+     "sentence": "Attention weights are computed with a softmax — über fast.", "source_type": "local",
+     "credibility": 0.8999999999999999, "source_url": None, "primary_category": None},
+    {"id": 5, "doc_id": "arxiv_1", "file_type": "pdf", "position": 0,
+     "sentence": "Scaling laws relate loss to compute.", "source_type": "arxiv",
+     "credibility": 1.0, "source_url": "https://arxiv.org/abs/1", "primary_category": "cs.CL"},
+]
+
+def write_jsonl(path, rows):
+    with open(path, "w", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+def test_round_trip(tmp_path):
+    src = tmp_path / "metas.jsonl"
+    dest = tmp_path / "store"
+    write_jsonl(src, ROWS)
+
+    assert convert_jsonl(src, dest) == 3
+
+    store = MetaStore(dest)
+    assert len(store) == 3
+    for row in ROWS:
+        assert store.get(row["id"]) == row
+        assert list(store.get(row["id"])) == list(row)
+
+    assert store.get(2) is None
+    assert store.get(99) is None
+    assert 5 in store and 3 not in store
+    assert store.source_bytes == src.stat().st_size
+
+def test_tail_rows_and_rebuild(tmp_path):
+    src = tmp_path / "metas.jsonl"
+    dest = tmp_path / "store"
+    write_jsonl(src, ROWS[:1])
+    convert_jsonl(src, dest)
+
+    store = MetaStore(dest)
+    store.add(ROWS[1:])
+    assert store.get(1) == ROWS[1]
+    assert len(store) == 3
+
+    write_jsonl(src, ROWS)
+    convert_jsonl(src, dest)
+    assert MetaStore(dest).get(5) == ROWS[2]
@@ -0,0 +1,44 @@
+from app.config import inference_backends
+from app.nli_cache import NLICache, cache_key
+
+PROBS = {"support": 0.7, "contradict": 0.1, "neutral": 0.2}
+
+def test_round_trip_across_instances(tmp_path):
+    path = tmp_path / "nli.sqlite"
+    key = cache_key("model", "the sky is blue", "The sky appears blue.")
+
+    cache = NLICache(path, write_batch=100)
+    assert cache.get_many([key]) == {}
+    cache.put_many({key: PROBS})
+    # buffered writes are visible before they are flushed
+    assert cache.get_many([key]) == {key: PROBS}
+    cache.flush()
+
+    assert NLICache(path).get_many([key]) == {key: PROBS}
+
+def test_key_depends_on_model_and_order():
+    assert cache_key("a", "x", "y") != cache_key("b", "x", "y")
+    assert cache_key("a", "x", "y") != cache_key("a", "y", "x")
+    assert cache_key("a", "x  y", "z") == cache_key("a", "x y", "z")
+
+def test_switching_backend_does_not_reuse_entries(tmp_path, monkeypatch):
+    cache = NLICache(tmp_path / "nli.sqlite")
+    monkeypatch.setitem(inference_backends, "model", "torch")
+    fp32_key = cache_key("model", "the sky is blue", "The sky appears blue.")
+    cache.put_many({fp32_key: PROBS})
+
+    monkeypatch.setitem(inference_backends, "model", "onnx-int8")
+    int8_key = cache_key("model", "the sky is blue", "The sky appears blue.")
+    assert int8_key != fp32_key
+    assert cache.get_many([int8_key]) == {}
+
+def test_prune_keeps_most_recently_used(tmp_path):
+    cache = NLICache(tmp_path / "nli.sqlite", max_entries=0, write_batch=1)
+    keys = [cache_key("model", f"claim {i}", "evidence") for i in range(5)]
+    for key in keys:
+        cache.put_many({key: PROBS})
+    cache.get_many(keys[:2])
+    cache.flush()
+
+    assert cache.prune(2) == 3
+    assert set(cache.get_many(keys)) == set(keys[:2])
@@ -0,0 +1,57 @@
+import numpy as np
+
+from app.query_cache import QueryEmbeddingCache
+from app.utils.lru import LRUCache
+
+
+def fake_encoder(calls):
+    def encode(texts):
+        calls.append(list(texts))
+        return np.array([[len(t), 1.0] for t in texts], dtype=np.float32)
+    return encode
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert "a" in cache and "c" in cache and "b" not in cache
+    assert cache.stats()["evictions"] == 1
+
+
+def test_lru_byte_bound():
+    cache = LRUCache(10, max_bytes=5, sizeof=len)
+    cache.put("a", "xxx")
+    cache.put("b", "yyy")
+
+    assert "a" not in cache and cache.bytes == 3
+
+
+def test_only_misses_are_encoded():
+    calls = []
+    cache = QueryEmbeddingCache("model", 10)
+
+    first = cache.encode(["vaccines work", "vaccines  work", "x"], fake_encoder(calls))
+    second = cache.encode(["x", "new query"], fake_encoder(calls))
+
+    assert calls == [["vaccines work", "x"], ["new query"]]
+    assert np.array_equal(first[0], first[1])
+    assert np.array_equal(first[2], second[0])
+    assert cache.stats()["hits"] == 1
+
+
+def test_save_and_load(tmp_path):
+    cache = QueryEmbeddingCache("model", 10)
+    vectors = cache.encode(["a", "bb"], fake_encoder([]))
+    cache.save(tmp_path / "queries.npz")
+
+    calls = []
+    restored = QueryEmbeddingCache("model", 10)
+    assert restored.load(tmp_path / "queries.npz") == 2
+    assert np.array_equal(restored.encode(["a", "bb"], fake_encoder(calls)), vectors)
+    assert calls == []
+
+    assert QueryEmbeddingCache("other", 10).load(tmp_path / "queries.npz") == 0
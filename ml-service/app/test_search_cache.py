@@ -0,0 +1,61 @@
+import numpy as np
+import faiss
+import pytest
+
+pytest.importorskip("sklearn")
+
+from app import build_index, search
+from app.index_wal import IndexWAL
+from app.utils.lru import LRUCache
+
+D = 16
+
+def vector(text):
+    v = np.zeros(D, dtype="float32")
+    v[int(text.split()[-1])] = 1.0
+    return v
+
+def encode(texts, show_progress_bar=False):
+    return np.stack([vector(t) for t in texts])
+
+@pytest.fixture
+def encoded(tmp_path, monkeypatch):
+    index = faiss.IndexIDMap(faiss.IndexFlatIP(D))
+    index.add_with_ids(encode([f"sentence {i}" for i in range(5)]), np.arange(5))
+
+    monkeypatch.setattr(build_index, "index", index)
+    monkeypatch.setattr(build_index, "faiss_index", tmp_path / "index.faiss")
+    monkeypatch.setattr(build_index, "wal", IndexWAL(tmp_path / "index.faiss.wal"))
+    monkeypatch.setattr(build_index, "_encode", encode)
+    monkeypatch.setattr(search, "id_to_meta", {i: {"sentence": f"sentence {i}"} for i in range(5)})
+    monkeypatch.setattr(search, "result_cache", LRUCache(16))
+
+    # every query that misses the result cache is encoded once
+    queries = []
+
+    def encode_queries(texts):
+        queries.extend(texts)
+        return encode(texts)
+
+    monkeypatch.setattr(search, "_encode_queries", encode_queries)
+    return queries
+
+def test_repeated_query_is_served_from_cache(encoded):
+    first = search.search("sentence 3", top_k=3)
+    assert search.search("sentence  3", top_k=3) == first
+    assert encoded == ["sentence 3"]
+
+def test_generation_bump_invalidates_cached_results(encoded):
+    search.search("sentence 3", top_k=3)
+    build_index._bump_generation()
+    search.search("sentence 3", top_k=3)
+    assert encoded == ["sentence 3", "sentence 3"]
+
+def test_added_vectors_show_up_after_a_cached_search(encoded):
+    before = search.search("sentence 9", top_k=3)
+    assert 9 not in [r["id"] for r in before]
+
+    build_index.add_faiss_index([{"id": 9, "sentence": "sentence 9"}])
+
+    after = search.search("sentence 9", top_k=3)
+    assert after[0]["id"] == 9
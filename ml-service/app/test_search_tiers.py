@@ -0,0 +1,40 @@
+import numpy as np
+import faiss
+import pytest
+
+pytest.importorskip("sklearn")
+
+from app.search_tiers import _exact_neighbours
+
+D = 16
+
+def data(n=500, nq=20):
+    rng = np.random.default_rng(0)
+    xb = rng.standard_normal((n, D)).astype("float32")
+    xq = rng.standard_normal((nq, D)).astype("float32")
+    faiss.normalize_L2(xb)
+    faiss.normalize_L2(xq)
+    return xb, xq, np.arange(n, dtype=np.int64) * 7 + 3
+
+def brute_force(xb, ids, xq, k):
+    return ids[np.argsort(-(xq @ xb.T), axis=1)[:, :k]]
+
+@pytest.mark.parametrize("spec", ["HNSW8,Flat", "IVF4,Flat"])
+def test_exact_neighbours_match_brute_force(spec):
+    xb, xq, ids = data()
+    index = faiss.IndexIDMap(faiss.index_factory(D, spec, faiss.METRIC_INNER_PRODUCT))
+    index.train(xb)
+    index.add_with_ids(xb, ids)
+
+    # small blocks exercise the merge across blocks
+    found = _exact_neighbours(index, xq, 10, block_rows=64)
+    assert np.array_equal(found, brute_force(xb, ids, xq, 10))
+
+def test_top_k_beyond_corpus_pads_with_minus_one():
+    xb, xq, ids = data(n=5, nq=2)
+    index = faiss.IndexIDMap(faiss.IndexHNSWFlat(D, 8, faiss.METRIC_INNER_PRODUCT))
+    index.add_with_ids(xb, ids)
+
+    found = _exact_neighbours(index, xq, 8)
+    assert np.array_equal(found[:, :5], brute_force(xb, ids, xq, 5))
+    assert (found[:, 5:] == -1).all()
@@ -0,0 +1,89 @@
+import random
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("sklearn")
+
+from app import subclaim_pipeline
+from app.claim_pipeline import decide_final_verdict
+
+def evidence(rng, text, n):
+    # rerank scores straddle zero and sentences repeat, like real rerank output
+    return [
+        {
+            "id": i,
+            "sentence": f"{text} sentence {rng.randint(0, 6)}",
+            "faiss_score": rng.random(),
+            "rerank_score": rng.uniform(-3, 3)
+        }
+        for i in range(n)
+    ]
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    rng = random.Random(0)
+    corpus = {}
+    probs = {}
+    calls = []
+
+    def stance_score_batch(pairs):
+        calls.append(len(pairs))
+        return [dict(probs[sentence]) for _, sentence in pairs]
+
+    def search_many(texts, **kwargs):
+        return [[dict(e) for e in corpus[t]] for t in texts]
+
+    def reranker_many(texts, retrieved, top_n):
+        return [sorted(r, key=lambda e: -e["rerank_score"])[:top_n] for r in retrieved]
+
+    monkeypatch.setattr(subclaim_pipeline, "stance_score_batch", stance_score_batch)
+    monkeypatch.setattr(subclaim_pipeline, "search_many", search_many)
+    monkeypatch.setattr(subclaim_pipeline, "reranker_many", reranker_many)
+    monkeypatch.setattr(subclaim_pipeline, "search", lambda text, **kwargs: search_many([text])[0])
+    monkeypatch.setattr(
+        subclaim_pipeline, "reranker", lambda text, retrieved, top_n: reranker_many([text], [retrieved], top_n)[0]
+    )
+    monkeypatch.setattr(subclaim_pipeline, "log_nli_pair", lambda **kwargs: None)
+
+    def new_claim(n_subclaims):
+        corpus.clear()
+        for j in range(n_subclaims):
+            corpus[f"subclaim {j}"] = evidence(rng, f"subclaim {j}", rng.randint(0, 10))
+        for evs in corpus.values():
+            for e in evs:
+                s = rng.random() ** rng.choice([1, 3])
+                probs[e["sentence"]] = {"support": s, "contradict": rng.random() * (1 - s), "neutral": 0.0}
+        return [SimpleNamespace(text=t) for t in corpus]
+
+    return SimpleNamespace(new_claim=new_claim, rng=rng, calls=calls)
+
+def weighted_only(sentences):
+    return [e["id"] for e in sentences if e["rerank_score"] > 0]
+
+def run_batch(subclaims, early_stop):
+    return subclaim_pipeline.run_subclaim_pipeline_batch(subclaims, early_stop=early_stop)
+
+def run_sequential(subclaims, early_stop):
+    return [subclaim_pipeline.run_subclaim_pipeline(sc, early_stop=early_stop) for sc in subclaims]
+
+@pytest.mark.parametrize("run", [run_batch, run_sequential])
+def test_early_stop_matches_full_evaluation(pipeline, run):
+    saved = 0
+    for _ in range(300):
+        subclaims = pipeline.new_claim(pipeline.rng.randint(1, 4))
+        full = run(subclaims, early_stop=False)
+        full_calls = sum(pipeline.calls)
+        pipeline.calls.clear()
+        early = run(subclaims, early_stop=True)
+        saved += full_calls - sum(pipeline.calls)
+        pipeline.calls.clear()
+
+        assert decide_final_verdict(early) == decide_final_verdict(full)
+        for a, b in zip(full, early):
+            assert (a["verdict"], a["controversial"]) == (b["verdict"], b["controversial"])
+            assert a["strengths"] == pytest.approx(b["strengths"])
+            for kind in ("supporting", "contradicting"):
+                assert weighted_only(a["evidence"][kind]) == weighted_only(b["evidence"][kind])
+    assert saved > 0
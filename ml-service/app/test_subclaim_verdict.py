@@ -0,0 +1,50 @@
+import random
+
+from app.subclaim_verdict import get_verdict, get_controversy, verdict_is_decided
+
+def outcome(support, contradict):
+    agg = {
+        "total_strength": support + contradict,
+        "support_strength": support,
+        "contradict_strength": contradict
+    }
+    verdict = get_verdict(agg)[0]
+    return verdict, get_controversy(agg, verdict)
+
+def test_nothing_left_is_decided():
+    assert verdict_is_decided(0.0, 0.0, 0.0)
+    assert verdict_is_decided(1.0, 0.3, 0.0)
+
+def test_clear_support_is_decided():
+    # even if everything left contradicted, the ratio stays above 0.75
+    assert verdict_is_decided(5.0, 0.0, 1.0)
+
+def test_close_call_is_not_decided():
+    assert not verdict_is_decided(1.0, 0.0, 1.0)
+    assert not verdict_is_decided(0.6, 0.4, 0.2)
+
+def test_below_strength_threshold_is_not_decided_while_it_can_be_crossed():
+    assert not verdict_is_decided(0.1, 0.0, 0.5)
+    assert not verdict_is_decided(0.0, 0.0, 0.1)
+
+def test_controversy_flag_must_be_settled_too():
+    # SUPPORT either way, but the contradict share can still pass 0.25
+    assert outcome(3.0, 0.6)[0] == outcome(3.0, 1.6)[0] == "SUPPORT"
+    assert not verdict_is_decided(3.0, 0.6, 1.0)
+
+def test_decided_means_every_completion_agrees():
+    rng = random.Random(0)
+    for _ in range(20000):
+        support = rng.choice([0.0, rng.random() * 3])
+        contradict = rng.choice([0.0, rng.random() * 3])
+        remaining = rng.random() * rng.choice([0.1, 1.0, 3.0])
+        if not verdict_is_decided(support, contradict, remaining):
+            continue
+
+        expected = outcome(support, contradict)
+        assert outcome(support + remaining, contradict) == expected
+        assert outcome(support, contradict + remaining) == expected
+        for _ in range(20):
+            a = rng.random() * remaining
+            b = rng.random() * (remaining - a)
+            assert outcome(support + a, contradict + b) == expected
@@ -0,0 +1,80 @@
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    # thread-safe LRU bounded by entry count and, when sizeof is given, by
+    # the total size of the cached values
+    def __init__(self, capacity, max_bytes=None, sizeof=None):
+        self.capacity = capacity
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+
+        self._data = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        if self.capacity <= 0:
+            return
+        size = self.sizeof(value) if self.sizeof is not None else 0
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._data:
+                self.bytes -= self._sizes.pop(key)
+                del self._data[key]
+            self._data[key] = value
+            self._sizes[key] = size
+            self.bytes += size
+
+            while len(self._data) > self.capacity or (
+                self.max_bytes is not None and self.bytes > self.max_bytes
+            ):
+                old, _ = self._data.popitem(last=False)
+                self.bytes -= self._sizes.pop(old)
+                self.evictions += 1
+
+    def items(self):
+        # least recently used first
+        with self._lock:
+            return list(self._data.items())
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._sizes.clear()
+            self.bytes = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "capacity": self.capacity,
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0
+        }